@@ -2,23 +2,26 @@
 Исследование влияния частоты чтения на буфер смартфона
 Study of reading frequency impact on smartphone buffer
 """
+import os
 import random
+import sys
 import statistics
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Общий модуль графиков plotting.py лежит в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from plotting import MAX_POINTS, decimate, finish_figure, get_figure
+from readpolicy import (HOUR_MS, OVERFLOW_POLICIES, READ_POLICIES, FixedPolling,
+                        delivery_latencies, run as run_policy)
+
 PIPELINE_RU = "Датчик → Fog → Курьер → Телефон"
 PIPELINE_EN = "Sensor → Fog → Courier → Phone"
 
-def simulate(n_tasks=30, seed=7, read_interval_ms=120):
+def stage_latencies(n_tasks=30, seed=7):
     """
-    Симуляция конвейера обработки данных
-    Simulation of data processing pipeline
-    
-    Args:
-        n_tasks: количество задач / number of tasks
-        seed: seed для воспроизводимости / seed for reproducibility
-        read_interval_ms: интервал чтения телефона (мс) / phone reading interval (ms)
+    Сквозные задержки задач (сумма времён этапов)
+    End-to-end task latencies (sum of stage times)
     """
     random.seed(seed)
     
@@ -29,36 +32,69 @@ def simulate(n_tasks=30, seed=7, read_interval_ms=120):
 
     # End‑to‑end latency per task is the sum of stage times:
     # Сквозная задержка на задачу — это сумма времен этапов:
-    latencies = [s + f + c for s, f, c in zip(sensor, fog, courier)]
+    return [s + f + c for s, f, c in zip(sensor, fog, courier)]
+
+def simulate(n_tasks=30, seed=7, read_interval_ms=120, policy=None,
+             capacity=None, overflow='drop_oldest'):
+    """
+    Симуляция конвейера обработки данных
+    Simulation of data processing pipeline
+    
+    Args:
+        n_tasks: количество задач / number of tasks
+        seed: seed для воспроизводимости / seed for reproducibility
+        read_interval_ms: интервал чтения телефона (мс) / phone reading interval (ms)
+        policy: политика чтения из readpolicy (None — фиксированный read_interval_ms)
+                / read policy from readpolicy (None — fixed read_interval_ms)
+        capacity: ёмкость буфера телефона (None — без ограничения) / phone buffer capacity
+        overflow: политика переполнения (readpolicy.OVERFLOW_POLICIES) / overflow policy
+    """
+    latencies = stage_latencies(n_tasks, seed)
+    if policy is not None or capacity is not None:
+        return simulate_policy(latencies, policy or FixedPolling(read_interval_ms),
+                               capacity, overflow)
 
     # Phone buffer: phone "reads" messages every read_interval_ms
     # Буфер телефона: телефон "читает" сообщения каждые read_interval_ms
+    # Каждое чтение забирает одно сообщение, поэтому k чтений между
+    # прибытиями сокращают буфер сразу: buf = max(0, buf - k)
     time = 0
     buffer_sizes = []
     buf = 0
-    read_times = []  # Времена чтений
+    reads_done = 0  # Число выполненных чтений
+    # FIFO по индексам: сообщения head..head+buf-1 ждут в буфере, момент
+    # чтения записывается каждому сообщению один раз — O(1) на сообщение
+    head = 0
+    arrivals = []
+    delivered = [0] * len(latencies)
     
     for L in latencies:
         time += L
-        # Проверяем, сколько чтений произошло за это время
+        # Сколько чтений произошло с прошлого прибытия
         reads = time // read_interval_ms
-        for _ in range(int(reads - len(read_times))):
-            if buf > 0:
-                buf -= 1
-            read_times.append(len(read_times) * read_interval_ms)
+        # Сообщения забирают первые чтения после прошлого прибытия
+        drained = min(buf, reads - reads_done)
+        for j in range(drained):
+            delivered[head + j] = (reads_done + 1 + j) * read_interval_ms
+        head += drained
+        buf -= drained
+        reads_done = reads
         buf += 1
         buffer_sizes.append(buf)
+        arrivals.append(time)
 
     # Завершаем все чтения до конца симуляции
-    final_time = time
-    final_reads = final_time // read_interval_ms
-    for _ in range(int(final_reads - len(read_times))):
-        if buf > 0:
-            buf -= 1
-        read_times.append(len(read_times) * read_interval_ms)
+    final_reads = time // read_interval_ms
+    # Времена чтений — арифметическая прогрессия / Read instants as an arithmetic range
+    read_times = range(0, final_reads * read_interval_ms, read_interval_ms)
+    # Оставшиеся сообщения забирают чтения после последнего прибытия
+    for j in range(buf):
+        delivered[head + j] = (final_reads + 1 + j) * read_interval_ms
     
     avg_latency = statistics.mean(latencies)
     p95 = statistics.quantiles(latencies, n=20)[18]  # ≈95th percentile
+    # Задержка доставки: этапы конвейера + ожидание в буфере до чтения
+    delivery = [L + d - a for L, d, a in zip(latencies, delivered, arrivals)]
     
     # Дополнительные метрики для буфера
     max_buffer = max(buffer_sizes) if buffer_sizes else 0
@@ -74,9 +110,205 @@ def simulate(n_tasks=30, seed=7, read_interval_ms=120):
         'avg_buffer': avg_buffer,
         'buffer_empty_percentage': buffer_empty_percentage,
         'read_interval': read_interval_ms,
-        'read_times': read_times
+        'read_times': read_times,
+        'delivery_latencies': delivery,
+        'avg_delivery': statistics.mean(delivery),
+        'p95_delivery': statistics.quantiles(delivery, n=20)[18],
+        'wakeups_per_hour': HOUR_MS / read_interval_ms
+    }
+
+def simulate_policy(latencies, policy, capacity=None, overflow='drop_oldest'):
+    """
+    Буфер телефона под политикой чтения (readpolicy), возможно ограниченный
+    Phone buffer under a read policy (readpolicy), optionally bounded
+
+    Кроме метрик simulate возвращает задержку доставки — задержку этапов,
+    ожидание курьера при backpressure и время в буфере до чтения — по
+    доставленным сообщениям, долю потерь и число пробуждений телефона
+    в час модельного времени.
+    """
+    reads = run_policy(policy, np.cumsum(latencies).tolist(), capacity, overflow)
+    buffer_sizes = reads['buffer_sizes']
+    read_times = reads['read_times']
+    delivery = delivery_latencies(latencies, reads)
+    delivery = delivery[~np.isnan(delivery)].tolist()
+    duration = read_times[-1] if read_times else 0
+
+    return {
+        'latencies': latencies,
+        'buffer_sizes': buffer_sizes,
+        'avg_latency': statistics.mean(latencies),
+        'p95': statistics.quantiles(latencies, n=20)[18],
+        'max_buffer': max(buffer_sizes),
+        'avg_buffer': statistics.mean(buffer_sizes),
+        'buffer_empty_percentage': buffer_sizes.count(1) / len(buffer_sizes) * 100,
+        'read_interval': duration / len(read_times) if read_times else 0,
+        'read_times': read_times,
+        'delivery_latencies': delivery,
+        'avg_delivery': statistics.mean(delivery),
+        'p95_delivery': statistics.quantiles(delivery, n=20)[18],
+        'dropped': reads['dropped'],
+        'loss_rate': reads['dropped'] / len(latencies),
+        'courier_blocked_ms': sum(reads['blocked']),
+        'wakeups': len(read_times),
+        'wakeups_per_hour': len(read_times) / duration * HOUR_MS if duration else 0,
+        'policy': policy,
+        'capacity': capacity,
+        'overflow': overflow
+    }
+
+def simulate_stream(n_tasks=None, seed=7, read_interval_ms=120, duration_ms=None):
+    """
+    Потоковая симуляция конвейера: генератор событий по задачам
+    Streaming pipeline simulation: generator of per-task events
+
+    Хранит только O(1) состояния (время, буфер, число чтений), поэтому
+    через конвейер можно прогнать сутки трафика датчиков. Задержки этапов
+    берутся поочерёдно для каждой задачи, поэтому при том же seed
+    последовательность отличается от simulate().
+
+    Args:
+        n_tasks: количество задач (None — без ограничения) / number of tasks (None — unbounded)
+        seed: seed для воспроизводимости / seed for reproducibility
+        read_interval_ms: интервал чтения телефона (мс) / phone reading interval (ms)
+        duration_ms: остановиться, когда модельное время превысит это значение / stop after this model time
+
+    Yields:
+        dict: task, time, latency, buffer (сообщений после прихода задачи),
+              reads (чтений с предыдущей задачи), drained (из них забрали сообщение)
+    """
+    rng = random.Random(seed)
+    time = 0
+    buf = 0
+    reads_done = 0
+    task = 0
+
+    while n_tasks is None or task < n_tasks:
+        latency = rng.randint(20, 60) + rng.randint(30, 80) + rng.randint(10, 40)
+        time += latency
+        if duration_ms is not None and time > duration_ms:
+            return
+
+        # Чтения, случившиеся до прихода задачи, забирают по одному сообщению
+        reads = time // read_interval_ms - reads_done
+        reads_done += reads
+        drained = min(buf, reads)
+        buf = buf - drained + 1
+
+        yield {
+            'task': task,
+            'time': time,
+            'latency': latency,
+            'buffer': buf,
+            'reads': reads,
+            'drained': drained
+        }
+        task += 1
+
+def summarize_stream(events):
+    """
+    Сводка по потоку событий simulate_stream за O(1) памяти
+    Summary of a simulate_stream event stream in O(1) memory
+    """
+    n = 0
+    latency_sum = 0
+    buffer_sum = 0
+    max_buffer = 0
+    single_message = 0
+    reads = 0
+    time = 0
+
+    for event in events:
+        n += 1
+        latency_sum += event['latency']
+        buffer_sum += event['buffer']
+        max_buffer = max(max_buffer, event['buffer'])
+        single_message += event['buffer'] == 1
+        reads += event['reads']
+        time = event['time']
+
+    return {
+        'tasks': n,
+        'duration_ms': time,
+        'avg_latency': latency_sum / n if n else 0,
+        'max_buffer': max_buffer,
+        'avg_buffer': buffer_sum / n if n else 0,
+        'buffer_empty_percentage': single_message / n * 100 if n else 0,
+        'reads': reads
     }
 
+# Поля результата sweep_read_intervals / Fields of the sweep_read_intervals result
+SWEEP_FIELDS = [
+    ('interval', np.int64),
+    ('seed', np.int64),
+    ('max_buffer', np.int64),
+    ('avg_buffer', np.float64),
+    ('buffer_empty_percentage', np.float64),
+    ('avg_latency', np.float64),
+    ('p50', np.float64),
+    ('p95', np.float64),
+    ('p99', np.float64),
+    ('avg_delivery', np.float64),
+    ('p95_delivery', np.float64),
+]
+
+def sweep_read_intervals(intervals, seeds=(7,), n_tasks=30, max_elements=2**23):
+    """
+    Оценка сетки интервалов чтения × seed одним векторным проходом NumPy
+    Evaluate an interval × seed grid in a batched NumPy pass
+
+    Задержки этапов генерируются один раз на seed (как в simulate) и
+    используются для всех интервалов. Буфер считается по рекурсии Линдли
+    в замкнутой форме: b_t = S_t - min(1, min_{k<=t} S_k) + 1, где
+    S_t — накопленная сумма (1 - чтений между прибытиями).
+
+    Задержка доставки (этапы + ожидание в буфере, как в simulate): FIFO
+    с одним сообщением за чтение, поэтому номер чтения сообщения i —
+    r_i = max(a_i, r_{i-1} + 1), где a_i — первое чтение после прибытия,
+    т.е. r_i = i + max_{k<=i} (a_k - k).
+
+    Returns:
+        структурированный массив формы (len(intervals), len(seeds)) с полями SWEEP_FIELDS
+        structured array of shape (len(intervals), len(seeds)) with SWEEP_FIELDS
+    """
+    intervals = np.asarray(intervals, dtype=np.int64)
+    seeds = np.asarray(seeds, dtype=np.int64)
+    latencies = np.array([stage_latencies(n_tasks, int(seed)) for seed in seeds], dtype=np.int64)
+    arrivals = np.cumsum(latencies, axis=1)
+
+    results = np.zeros((len(intervals), len(seeds)), dtype=SWEEP_FIELDS)
+    results['interval'] = intervals[:, None]
+    results['seed'] = seeds[None, :]
+
+    # Задержки не зависят от интервала чтения / Latencies do not depend on the read interval
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99], axis=1, method='weibull')
+    results['avg_latency'] = latencies.mean(axis=1)
+    results['p50'] = p50
+    results['p95'] = p95
+    results['p99'] = p99
+
+    # Интервалы обрабатываются блоками, чтобы ограничить память
+    chunk = max(1, max_elements // max(1, latencies.size))
+    for start in range(0, len(intervals), chunk):
+        block = intervals[start:start + chunk, None, None]
+        reads = arrivals[None, :, :] // block
+        drained = np.diff(reads, axis=2, prepend=0)
+        steps = np.cumsum(1 - drained, axis=2)
+        buffers = steps - np.minimum(np.minimum.accumulate(steps, axis=2), 1) + 1
+
+        results['max_buffer'][start:start + chunk] = buffers.max(axis=2)
+        results['avg_buffer'][start:start + chunk] = buffers.mean(axis=2)
+        results['buffer_empty_percentage'][start:start + chunk] = (buffers == 1).mean(axis=2) * 100
+
+        # Номер чтения, забравшего сообщение, и задержка доставки
+        order = np.arange(latencies.shape[1])
+        read_index = order + np.maximum.accumulate(reads + 1 - order, axis=2)
+        delivery = latencies[None, :, :] + read_index * block - arrivals[None, :, :]
+        results['avg_delivery'][start:start + chunk] = delivery.mean(axis=2)
+        results['p95_delivery'][start:start + chunk] = np.percentile(delivery, 95, axis=2, method='weibull')
+
+    return results
+
 def run_comparison():
     """Запуск сравнения трех сценариев"""
     scenarios = [
@@ -102,6 +334,8 @@ def run_comparison():
         # Вывод метрик
         print(f"   • Средняя задержка: {result['avg_latency']:.2f} мс")
         print(f"   • 95-й перцентиль: {result['p95']:.2f} мс")
+        print(f"   • Средняя задержка доставки (с буфером): {result['avg_delivery']:.2f} мс")
+        print(f"   • 95-й перцентиль доставки: {result['p95_delivery']:.2f} мс")
         print(f"   • Максимальный буфер: {result['max_buffer']} сообщений")
         print(f"   • Средний буфер: {result['avg_buffer']:.2f} сообщений")
         print(f"   • % времени с 1 сообщением: {result['buffer_empty_percentage']:.1f}%")
@@ -110,14 +344,14 @@ def run_comparison():
 
 def plot_comparison(scenarios, results):
     """Визуализация сравнения сценариев"""
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+    fig, axes = get_figure('comparison', 2, 2, figsize=(14, 10))
     
     # График 1: Сравнение размеров буфера
     ax1 = axes[0, 0]
     for scenario in scenarios:
         name = scenario['name']
         buffer_data = results[name]['buffer_sizes']
-        ax1.plot(range(1, len(buffer_data) + 1), buffer_data, 
+        ax1.plot(*decimate(None, buffer_data), 
                 label=f"{name} ({scenario['interval']} мс)",
                 color=scenario['color'], marker=scenario['marker'], markersize=4, linewidth=1.5)
     
@@ -178,19 +412,20 @@ def plot_comparison(scenarios, results):
     plt.suptitle('Влияние частоты чтения сообщений на размер буфера смартфона', 
                  fontsize=14, fontweight='bold', y=1.02)
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'comparison')
     
     # Вывод результатов в таблице
     print("\n" + "=" * 70)
     print("РЕЗЮМЕ РЕЗУЛЬТАТОВ")
     print("=" * 70)
-    print(f"{'Сценарий':<25} {'Интервал':<10} {'Макс.буфер':<12} {'Ср.буфер':<10} {'% пустого':<10}")
-    print("-" * 70)
+    print(f"{'Сценарий':<25} {'Интервал':<10} {'Макс.буфер':<12} {'Ср.буфер':<10} {'% пустого':<10} {'Ср.доставка':<12} {'P95 доставки':<12}")
+    print("-" * 95)
     
     for scenario in scenarios:
         name = scenario['name']
         r = results[name]
-        print(f"{name:<25} {r['read_interval']:<10} {r['max_buffer']:<12} {r['avg_buffer']:<10.2f} {r['buffer_empty_percentage']:<10.1f}")
+        print(f"{name:<25} {r['read_interval']:<10} {r['max_buffer']:<12} {r['avg_buffer']:<10.2f} {r['buffer_empty_percentage']:<10.1f} "
+              f"{r['avg_delivery']:<12.1f} {r['p95_delivery']:<12.1f}")
     
     # Анализ результатов
     print("\n" + "=" * 70)
@@ -204,11 +439,13 @@ def plot_comparison(scenarios, results):
     print(f"   • Буфер растет медленнее (макс. {fast['max_buffer']} сообщений)")
     print(f"   • Чаще опустошается ({fast['buffer_empty_percentage']:.1f}% времени с 1 сообщением)")
     print(f"   • Средний размер буфера меньше ({fast['avg_buffer']:.2f} сообщений)")
+    print(f"   • Средняя задержка доставки {fast['avg_delivery']:.1f} мс")
     
     print("\n2. При ЗАМЕДЛЕННОЙ обработке (интервал 200 мс):")
     print(f"   • Буфер растет быстрее (макс. {slow['max_buffer']} сообщений)")
     print(f"   • Редко опустошается ({slow['buffer_empty_percentage']:.1f}% времени с 1 сообщением)")
     print(f"   • Средний размер буфера больше ({slow['avg_buffer']:.2f} сообщений)")
+    print(f"   • Средняя задержка доставки {slow['avg_delivery']:.1f} мс")
     
     print("\n3. ВЫВОД:")
     print("   ✓ Уменьшение интервала чтения (более частая обработка) приводит к:")
@@ -220,20 +457,88 @@ def plot_comparison(scenarios, results):
     print("     - Риску переполнения при пиковых нагрузках")
     print("     - Увеличению задержек доставки сообщений")
 
+def run_policy_comparison(policies=READ_POLICIES, n_tasks=2000, seed=7):
+    """
+    Сравнение политик чтения: энергия (пробуждения в час) против задержки доставки
+    Read policy comparison: energy (wakeups per hour) versus delivery latency
+    """
+    results = {name: simulate(n_tasks, seed, policy=policy) for name, policy in policies.items()}
+
+    print("\n" + "=" * 70)
+    print("АДАПТИВНЫЕ ПОЛИТИКИ ЧТЕНИЯ / ADAPTIVE READ POLICIES")
+    print("=" * 70)
+    print(f"{'Политика':<12} {'Пробужд./ч':<12} {'Ср.буфер':<10} {'Макс.буфер':<12} {'Ср.доставка':<13} {'P95 доставки':<12}")
+    print("-" * 70)
+    for name, r in results.items():
+        print(f"{name:<12} {r['wakeups_per_hour']:<12.0f} {r['avg_buffer']:<10.2f} {r['max_buffer']:<12} "
+              f"{r['avg_delivery']:<13.1f} {r['p95_delivery']:<12.1f}")
+
+    fig, ax = get_figure('read_policies', figsize=(8, 5))
+    for name, r in results.items():
+        ax.scatter(r['wakeups_per_hour'], r['p95_delivery'], s=60)
+        ax.annotate(name, (r['wakeups_per_hour'], r['p95_delivery']),
+                    textcoords='offset points', xytext=(5, 5))
+    ax.set_title('Энергия против задержки доставки\nEnergy vs Delivery Latency', fontweight='bold')
+    ax.set_xlabel('Пробуждений телефона в час / Wakeups per hour')
+    ax.set_ylabel('P95 задержки доставки, мс / P95 delivery latency, ms')
+    ax.grid(True, alpha=0.3)
+    plt.tight_layout()
+    finish_figure(fig, 'read_policies')
+
+    return results
+
+def run_overflow_comparison(capacity=8, intervals=(120, 200), n_tasks=2000, seed=7):
+    """
+    Ограниченный буфер телефона: потери и задержка доставки по политикам переполнения
+    Bounded phone buffer: loss rate and delivery latency per overflow policy
+    """
+    print("\n" + "=" * 70)
+    print(f"БУФЕР НА {capacity} СООБЩЕНИЙ / BOUNDED BUFFER ({capacity} MESSAGES)")
+    print("=" * 70)
+    print(f"{'Интервал':<10} {'Политика':<14} {'Потери, %':<11} {'Ср.доставка':<13} {'P95 доставки':<14} {'Ожидание курьера':<16}")
+    print("-" * 70)
+    results = {}
+    for interval in intervals:
+        for overflow in OVERFLOW_POLICIES:
+            r = simulate(n_tasks, seed, interval, capacity=capacity, overflow=overflow)
+            results[interval, overflow] = r
+            print(f"{interval:<10} {overflow:<14} {r['loss_rate'] * 100:<11.1f} {r['avg_delivery']:<13.1f} "
+                  f"{r['p95_delivery']:<14.1f} {r['courier_blocked_ms']:<16.0f}")
+    return results
+
+def build_arrival_index(latencies):
+    """
+    Накопленные моменты прибытия задач — индекс для поиска по времени
+    Cumulative task arrival times — index for time lookups
+    """
+    return np.cumsum(latencies)
+
+def tasks_in_flight(arrival_index, times):
+    """
+    Номер задачи (с 1), которая была в пути в каждый момент times:
+    первая задача, прибывающая не раньше t. Значение len(arrival_index) + 1
+    означает, что все задачи прибыли раньше t. O(log N) на запрос.
+    Task number (1-based) in flight at each time t, via np.searchsorted.
+    """
+    return np.searchsorted(arrival_index, np.asarray(times), side='left') + 1
+
 def plot_detailed_scenario(read_interval_ms=120, scenario_name="Стандартная обработка"):
     """Детальная визуализация для одного сценария"""
     result = simulate(read_interval_ms=read_interval_ms)
     
-    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    fig, axes = get_figure('detailed_scenario', 1, 3, figsize=(15, 4))
     
     # График 1: Задержки
     ax1 = axes[0]
-    ax1.plot(range(1, len(result['latencies']) + 1), result['latencies'], 
+    ax1.plot(*decimate(None, result['latencies']), 
              marker='o', markersize=4, linewidth=1.5, color='blue')
     ax1.axhline(y=result['avg_latency'], color='red', linestyle='--', 
                 label=f'Среднее: {result["avg_latency"]:.2f} мс')
     ax1.axhline(y=result['p95'], color='orange', linestyle=':', 
                 label=f'P95: {result["p95"]:.2f} мс')
+    ax1.plot(*decimate(None, result['delivery_latencies']),
+             linewidth=1.5, color='green', alpha=0.7,
+             label=f'Доставка (с буфером), ср.: {result["avg_delivery"]:.2f} мс')
     ax1.set_title(f'Сквозная задержка ({scenario_name})', fontweight='bold')
     ax1.set_xlabel('Номер задачи')
     ax1.set_ylabel('Задержка, мс')
@@ -242,8 +547,7 @@ def plot_detailed_scenario(read_interval_ms=120, scenario_name="Стандарт
     
     # График 2: Буфер
     ax2 = axes[1]
-    tasks = range(1, len(result['buffer_sizes']) + 1)
-    ax2.plot(tasks, result['buffer_sizes'], marker='s', markersize=4, 
+    ax2.plot(*decimate(None, result['buffer_sizes']), marker='s', markersize=4, 
              linewidth=1.5, color='green')
     ax2.axhline(y=result['avg_buffer'], color='purple', linestyle='--',
                 label=f'Средний буфер: {result["avg_buffer"]:.2f}')
@@ -251,17 +555,13 @@ def plot_detailed_scenario(read_interval_ms=120, scenario_name="Стандарт
                 label=f'Максимум: {result["max_buffer"]}')
     
     # Показать моменты чтения
-    read_indices = []
-    for read_time in result['read_times']:
-        # Найдем, какая задача была обработана к этому времени
-        cumulative_time = 0
-        for i, latency in enumerate(result['latencies']):
-            cumulative_time += latency
-            if cumulative_time >= read_time:
-                read_indices.append(i + 1)
-                break
-    
-    if read_indices:
+    arrival_index = build_arrival_index(result['latencies'])
+    read_indices = tasks_in_flight(arrival_index, result['read_times'])
+    read_indices = read_indices[read_indices <= len(arrival_index)]
+    # Для длинных прогонов отмечаем только часть моментов чтения
+    read_indices = read_indices[::max(1, len(read_indices) // MAX_POINTS)]
+    
+    if len(read_indices):
         ax2.scatter(read_indices, [result['buffer_sizes'][i-1] for i in read_indices],
                    color='red', s=50, zorder=5, label='Моменты чтения', alpha=0.6)
     
@@ -273,10 +573,10 @@ def plot_detailed_scenario(read_interval_ms=120, scenario_name="Стандарт
     
     # График 3: Статистика
     ax3 = axes[2]
-    metrics = ['Ср.задержка', 'P95', 'Макс.буфер', 'Ср.буфер', '% с 1 сообщ.']
-    values = [result['avg_latency'], result['p95'], result['max_buffer'], 
+    metrics = ['Ср.задержка', 'P95', 'Ср.доставка', 'Макс.буфер', 'Ср.буфер', '% с 1 сообщ.']
+    values = [result['avg_latency'], result['p95'], result['avg_delivery'], result['max_buffer'], 
               result['avg_buffer'], result['buffer_empty_percentage']]
-    colors = ['blue', 'orange', 'red', 'purple', 'green']
+    colors = ['blue', 'orange', 'teal', 'red', 'purple', 'green']
     
     bars = ax3.bar(metrics, values, color=colors, alpha=0.7)
     ax3.set_title(f'Метрики ({scenario_name})', fontweight='bold')
@@ -295,7 +595,7 @@ def plot_detailed_scenario(read_interval_ms=120, scenario_name="Стандарт
     plt.suptitle(f'Анализ сценария: {scenario_name} (интервал чтения: {read_interval_ms} мс)',
                  fontsize=12, fontweight='bold', y=1.05)
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, f'scenario_{read_interval_ms}ms')
     
     return result
 
@@ -326,6 +626,12 @@ def main():
         print(f"\n📈 Анализ сценария: {name}")
         plot_detailed_scenario(interval, name)
     
+    # Адаптивные политики чтения: пробуждения против задержки доставки
+    run_policy_comparison()
+    
+    # Ограниченный буфер: потери или ожидание курьера
+    run_overflow_comparison()
+    
     print("\n" + "=" * 70)
     print("ЗАКЛЮЧЕНИЕ")
     print("=" * 70)
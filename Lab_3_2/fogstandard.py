@@ -11,9 +11,17 @@ Bilingual visualization of the pipeline: Sensor → Fog → Courier → Phone.
     Phone buffer size as messages arrive.
   • В консоли печатаются метрики на русском и английском.
     Console prints metrics in Russian and English.
+  • Ограниченный буфер телефона: потери и задержка доставки с учётом буфера.
+    Bounded phone buffer: loss rate and delivery latency including buffer time.
 """
-import random, statistics
+import os, random, statistics, sys
 import matplotlib.pyplot as plt
+import numpy as np
+
+# Общий модуль графиков plotting.py лежит в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from plotting import decimate, finish_figure, get_figure
+from readpolicy import OVERFLOW_POLICIES, FixedPolling, delivery_latencies, run as run_policy
 
 PIPELINE_RU = "Датчик → Fog → Курьер → Телефон"
 PIPELINE_EN = "Sensor → Fog → Courier → Phone"
@@ -38,9 +46,8 @@ def simulate(n_tasks=30, seed=7):
     for L in latencies:
         time += L
         reads = time // read_interval_ms
-        for _ in range(int(reads)):
-            if buf > 0:
-                buf -= 1
+        # Все reads чтений сразу: каждое забирает одно сообщение
+        buf = max(0, buf - reads)
         buf += 1
         buffer_sizes.append(buf)
 
@@ -49,11 +56,27 @@ def simulate(n_tasks=30, seed=7):
 
     return latencies, buffer_sizes, avg_latency, p95
 
+def simulate_bounded(n_tasks=30, seed=7, capacity=4, overflow='drop_oldest', read_interval_ms=120):
+    """
+    Буфер телефона на capacity сообщений с политикой переполнения overflow
+    (drop_oldest, drop_newest, backpressure — см. readpolicy).
+    Bounded phone buffer with an overflow policy.
+
+    Возвращает задержки доставки (этапы + ожидание курьера + время в буфере)
+    доставленных сообщений, размеры буфера, среднюю задержку, ~P95 и долю потерь.
+    """
+    latencies = simulate(n_tasks, seed)[0]
+    reads = run_policy(FixedPolling(read_interval_ms), np.cumsum(latencies).tolist(), capacity, overflow)
+    delivery = delivery_latencies(latencies, reads)
+    delivery = delivery[~np.isnan(delivery)].tolist()
+    loss_rate = reads['dropped'] / n_tasks
+
+    return delivery, reads['buffer_sizes'], statistics.mean(delivery), statistics.quantiles(delivery, n=20)[18], loss_rate
+
 def plot(latencies, buffer_sizes):
     # Plot 1: end‑to‑end latency (RU/EN)
-    plt.figure(figsize=(8, 4.5))
-    x = range(1, len(latencies)+1)
-    plt.plot(x, latencies, marker='o')
+    fig, _ = get_figure('latency', figsize=(8, 4.5))
+    plt.plot(*decimate(None, latencies), marker='o')
     plt.title(f"Сквозная задержка {PIPELINE_RU}\nEnd-to-End Latency {PIPELINE_EN}")
     plt.xlabel("Номер задачи / Task #")
     plt.ylabel("Задержка, мс / Latency, ms")
@@ -62,16 +85,16 @@ def plot(latencies, buffer_sizes):
              "Путь задержки / Latency path:\nДатчик→Fog→Курьер→Телефон\nSensor→Fog→Courier→Phone",
              transform=plt.gca().transAxes, fontsize=9, va='top')
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'latency')
 
     # Plot 2: phone buffer over arrivals (RU/EN)
-    plt.figure(figsize=(8, 4.5))
-    plt.plot(range(1, len(buffer_sizes)+1), buffer_sizes, marker='s')
+    fig, _ = get_figure('buffer', figsize=(8, 4.5))
+    plt.plot(*decimate(None, buffer_sizes), marker='s')
     plt.title("Буфер телефона по задачам / Phone Buffer Size over Tasks")
     plt.xlabel("Порядок прибытия задач / Arrival order (Task #)")
     plt.ylabel("Сообщений в буфере / Messages in buffer")
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'buffer')
 
 def main():
     latencies, buffer_sizes, avg_latency, p95 = simulate()
@@ -87,6 +110,14 @@ def main():
     # print(f"Average end-to-end latency (ms): {avg_latency:.2f}")
     # print(f"~95th percentile latency (ms): {p95:.2f}")
 
+    # Ограниченный буфер и телефон медленнее курьера: ожидание в буфере
+    # входит в задержку доставки
+    print("\n=== Буфер на 4 сообщения, чтение раз в 200 мс ===")
+    for overflow in OVERFLOW_POLICIES:
+        _, _, avg_delivery, p95_delivery, loss_rate = simulate_bounded(overflow=overflow, read_interval_ms=200)
+        print(f"{overflow:<13} потери: {loss_rate * 100:5.1f}%  "
+              f"ср. доставка: {avg_delivery:7.2f} мс  ~P95: {p95_delivery:7.2f} мс")
+
     plot(latencies, buffer_sizes)
 
 if __name__ == '__main__':
@@ -0,0 +1,192 @@
+"""
+readpolicy.py
+
+Политики чтения буфера телефона: когда телефон просыпается и сколько
+сообщений забирает за одно пробуждение.
+Phone buffer read policies: when the phone wakes up and how many
+messages it takes per wakeup.
+
+  • FixedPolling     — пробуждение каждые interval_ms (как в simulate);
+                       batch = k — пакетное чтение k сообщений за раз;
+  • AIMDPolling      — интервал сокращается в decrease_factor раз, если
+                       чтение застало сообщения, и растёт на increase_ms,
+                       если буфер пуст (AIMD, как окно TCP);
+  • ThresholdPolling — пробуждение по событию, как только в буфере
+                       threshold сообщений, и не реже раза в max_wait_ms.
+
+batch = 0 — забрать все сообщения. Политика — неизменяемый dataclass;
+изменяемое состояние (текущий интервал AIMD) передаётся через state.
+
+Буфер может быть ограничен capacity сообщениями (кольцевой буфер).
+При переполнении (OVERFLOW_POLICIES):
+  • drop_oldest  — самое старое сообщение вытесняется новым;
+  • drop_newest  — новое сообщение теряется;
+  • backpressure — курьер ждёт ближайшего чтения, освобождающего место,
+                   и все следующие задачи сдвигаются на время ожидания.
+"""
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+HOUR_MS = 3_600_000
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'backpressure')
+
+
+@dataclass(frozen=True)
+class FixedPolling:
+    """Чтение с постоянным интервалом"""
+    interval_ms: float = 120
+    batch: int = 1  # сообщений за пробуждение (0 — все)
+
+    def start(self):
+        """(состояние, момент первого пробуждения)"""
+        return None, self.interval_ms
+
+    def after_read(self, state, now, drained, remaining):
+        """(состояние, момент следующего пробуждения) после чтения в now"""
+        return None, now + self.interval_ms
+
+    def triggered(self, buffered):
+        """Будит ли телефон приход сообщения при buffered сообщениях в буфере"""
+        return False
+
+
+@dataclass(frozen=True)
+class AIMDPolling:
+    """Аддитивное увеличение интервала при пустом буфере, мультипликативное уменьшение при данных"""
+    min_interval_ms: float = 60
+    max_interval_ms: float = 480
+    increase_ms: float = 30
+    decrease_factor: float = 0.5
+    batch: int = 1
+
+    def start(self):
+        return self.max_interval_ms, self.max_interval_ms
+
+    def after_read(self, state, now, drained, remaining):
+        if drained:
+            interval = max(self.min_interval_ms, state * self.decrease_factor)
+        else:
+            interval = min(self.max_interval_ms, state + self.increase_ms)
+        return interval, now + interval
+
+    def triggered(self, buffered):
+        return False
+
+
+@dataclass(frozen=True)
+class ThresholdPolling:
+    """Чтение по заполнению буфера до threshold с ограничением ожидания max_wait_ms"""
+    threshold: int = 4
+    max_wait_ms: float = 1000
+    batch: int = 0
+
+    def start(self):
+        return None, self.max_wait_ms
+
+    def after_read(self, state, now, drained, remaining):
+        # Таймер отсчитывается от последнего пробуждения
+        return None, now + self.max_wait_ms
+
+    def triggered(self, buffered):
+        return buffered >= self.threshold
+
+
+# Готовые политики для сравнения
+READ_POLICIES = {
+    'fixed': FixedPolling(),
+    'batch': FixedPolling(interval_ms=480, batch=5),
+    'aimd': AIMDPolling(),
+    'threshold': ThresholdPolling(),
+}
+
+
+def run(policy, arrival_times, capacity=None, overflow='drop_oldest'):
+    """
+    Буфер телефона под политикой policy.
+
+    arrival_times — неубывающие моменты прихода сообщений, мс. Пробуждения,
+    совпавшие с приходом, выполняются до него (как в simulate); после
+    последнего прихода телефон просыпается, пока буфер не опустеет.
+    Очередь — deque индексов сообщений, O(1) на сообщение.
+    capacity — ёмкость буфера (None — без ограничения), overflow — политика
+    переполнения из OVERFLOW_POLICIES.
+
+    Returns:
+        dict: buffer_sizes (сообщений сразу после каждого прихода),
+              admitted (момент попадания в буфер с учётом backpressure),
+              blocked (ожидание курьера перед буфером, мс),
+              delivered (момент чтения; NaN — сообщение потеряно),
+              dropped (число потерянных сообщений), read_times
+    """
+    if overflow not in OVERFLOW_POLICIES:
+        raise ValueError(f"Неизвестная политика переполнения: {overflow}. Доступны: {', '.join(OVERFLOW_POLICIES)}")
+    if capacity is not None and capacity < 1:
+        raise ValueError(f"Ёмкость буфера должна быть не меньше 1: {capacity}")
+    n = len(arrival_times)
+    queue = deque()
+    delivered = [float('nan')] * n
+    admitted = [0.0] * n
+    blocked = [0.0] * n
+    buffer_sizes = []
+    read_times = []
+    dropped = 0
+    shift = 0.0  # суммарная задержка курьера из-за backpressure
+    state, wake = policy.start()
+
+    def read(now):
+        nonlocal state, wake
+        take = len(queue) if policy.batch == 0 else min(policy.batch, len(queue))
+        for _ in range(take):
+            delivered[queue.popleft()] = now
+        read_times.append(now)
+        state, wake = policy.after_read(state, now, take, len(queue))
+
+    for i, time in enumerate(arrival_times):
+        time += shift
+        while wake <= time:
+            read(wake)
+        if capacity is not None and len(queue) >= capacity:
+            if overflow == 'backpressure':
+                # Курьер ждёт чтения, освобождающего место в буфере
+                while len(queue) >= capacity:
+                    read(wake)
+                blocked[i] = read_times[-1] - time
+                shift += blocked[i]
+                time = read_times[-1]
+            else:
+                dropped += 1
+                if overflow == 'drop_newest':
+                    admitted[i] = time
+                    buffer_sizes.append(len(queue))
+                    continue
+                queue.popleft()
+        admitted[i] = time
+        queue.append(i)
+        buffer_sizes.append(len(queue))
+        if policy.triggered(len(queue)):
+            read(time)
+
+    while queue:
+        read(wake)
+
+    return {
+        'buffer_sizes': buffer_sizes,
+        'admitted': admitted,
+        'blocked': blocked,
+        'delivered': delivered,
+        'dropped': dropped,
+        'read_times': read_times
+    }
+
+
+def delivery_latencies(latencies, reads):
+    """
+    Сквозная задержка доставки каждого сообщения: этапы конвейера,
+    ожидание курьера (backpressure) и время в буфере до чтения, мс.
+    NaN — сообщение потеряно при переполнении.
+    """
+    return (np.asarray(latencies, dtype=np.float64) + np.asarray(reads['blocked'])
+            + np.asarray(reads['delivered']) - np.asarray(reads['admitted']))
@@ -0,0 +1,136 @@
+"""
+arrivals.py
+
+Модели потока задач во времени (для событийного движка).
+
+Каждое краевое устройство порождает задачи с интенсивностью
+rate_per_edge_s задач в секунду, поэтому суммарная нагрузка растёт с
+числом устройств:
+  • PoissonArrivals — стационарный пуассоновский поток;
+  • MMPPArrivals    — марковски-модулированный пуассоновский поток:
+                      режимы (например, «фон» и «всплеск») сменяют друг
+                      друга по кругу, длительность режима экспоненциальна;
+  • DiurnalArrivals — суточный профиль λ(t) = λ·(1 − a·cos 2πt/T)
+                      (неоднородный пуассоновский поток, метод прореживания).
+
+Режим MMPP и суточный профиль общие для всех устройств. Времена
+поступления генерируются векторно блоками NumPy; в arrival_blocks
+блоки нарезаются до нужного размера, остаток переносится в следующий
+блок.
+"""
+import math
+from dataclasses import dataclass, replace
+from typing import Tuple, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class PoissonArrivals:
+    """Пуассоновский поток"""
+    rate_per_edge_s: float = 1.0  # задач в секунду на одно краевое устройство
+
+    def mean_rate_s(self, n_edges):
+        """Средняя суммарная интенсивность, задач/с"""
+        return self.rate_per_edge_s * n_edges
+
+    def scaled(self, factor):
+        """Та же модель с интенсивностью, умноженной на factor"""
+        return replace(self, rate_per_edge_s=self.rate_per_edge_s * factor)
+
+    def chunks(self, rng, n_edges, size):
+        """Бесконечная последовательность возрастающих блоков времён поступления, мс"""
+        scale = 1000.0 / self.mean_rate_s(n_edges)
+        now = 0.0
+        while True:
+            times = now + np.cumsum(rng.exponential(scale, size))
+            now = times[-1]
+            yield times
+
+
+@dataclass(frozen=True)
+class MMPPArrivals:
+    """Марковски-модулированный пуассоновский поток (режимы сменяются по кругу)"""
+    rates_per_edge_s: Tuple[float, ...] = (0.5, 4.0)      # интенсивность в каждом режиме
+    mean_sojourn_ms: Tuple[float, ...] = (4000.0, 500.0)  # средняя длительность режима
+
+    def mean_rate_s(self, n_edges):
+        weighted = sum(rate * sojourn for rate, sojourn in zip(self.rates_per_edge_s, self.mean_sojourn_ms))
+        return weighted / sum(self.mean_sojourn_ms) * n_edges
+
+    def scaled(self, factor):
+        return replace(self, rates_per_edge_s=tuple(rate * factor for rate in self.rates_per_edge_s))
+
+    def chunks(self, rng, n_edges, size):
+        rates = np.asarray(self.rates_per_edge_s, dtype=np.float64) * n_edges / 1000.0  # задач/мс
+        sojourn = np.asarray(self.mean_sojourn_ms, dtype=np.float64)
+        n_states = len(rates)
+        # Число режимов на блок — чтобы в среднем набралось около size задач
+        per_cycle = float(np.dot(rates, sojourn))
+        n_periods = max(n_states, int(math.ceil(size / per_cycle * n_states)))
+        state, now = 0, 0.0
+        while True:
+            states = (state + np.arange(n_periods)) % n_states
+            durations = rng.exponential(sojourn[states])
+            starts = now + np.cumsum(durations) - durations
+            counts = rng.poisson(rates[states] * durations)
+            # Внутри режима моменты поступления — упорядоченные равномерные точки
+            times = np.repeat(starts, counts) + rng.random(counts.sum()) * np.repeat(durations, counts)
+            times.sort()
+            state = int((states[-1] + 1) % n_states)
+            now = starts[-1] + durations[-1]
+            yield times
+
+
+@dataclass(frozen=True)
+class DiurnalArrivals:
+    """Суточный профиль интенсивности (минимум в начале периода)"""
+    rate_per_edge_s: float = 1.0  # средняя интенсивность
+    amplitude: float = 0.8        # относительный размах, 0 <= a <= 1
+    period_ms: float = 60000.0    # длительность «суток» модели
+
+    def mean_rate_s(self, n_edges):
+        return self.rate_per_edge_s * n_edges
+
+    def scaled(self, factor):
+        return replace(self, rate_per_edge_s=self.rate_per_edge_s * factor)
+
+    def rate_at(self, time_ms, n_edges):
+        """Мгновенная интенсивность, задач/мс"""
+        return (self.mean_rate_s(n_edges) / 1000.0 *
+                (1 - self.amplitude * np.cos(2 * np.pi * np.asarray(time_ms) / self.period_ms)))
+
+    def chunks(self, rng, n_edges, size):
+        peak = self.mean_rate_s(n_edges) / 1000.0 * (1 + self.amplitude)
+        now = 0.0
+        while True:
+            # Кандидаты с пиковой интенсивностью, принимается доля λ(t) / λ_max
+            candidates = now + np.cumsum(rng.exponential(1.0 / peak, size))
+            now = candidates[-1]
+            yield candidates[rng.random(size) * peak < self.rate_at(candidates, n_edges)]
+
+
+ArrivalProcess = Union[PoissonArrivals, MMPPArrivals, DiurnalArrivals]
+
+# Готовые модели потока (ключ CONFIG['arrivals'])
+ARRIVAL_MODELS = {
+    'poisson': PoissonArrivals(),
+    'mmpp': MMPPArrivals(),
+    'diurnal': DiurnalArrivals(),
+}
+
+
+def arrival_blocks(process, rng, n_edges, n_tasks, block_size=65536):
+    """
+    Блоки (время поступления, мс; индекс краевого устройства) — всего
+    n_tasks задач, каждый блок длиной block_size (последний короче).
+    Устройство задачи равновероятно: интенсивности устройств одинаковы.
+    """
+    pending = np.empty(0)
+    chunks = process.chunks(rng, n_edges, block_size)
+    for start in range(0, n_tasks, block_size):
+        size = min(block_size, n_tasks - start)
+        while len(pending) < size:
+            pending = np.concatenate([pending, next(chunks)])
+        times, pending = pending[:size], pending[size:]
+        yield times, rng.integers(0, n_edges, size=size)
@@ -10,169 +10,66 @@ viz_cloud_fog_edge_pipeline_custom.py
   • Динамика очередей на Fog-узлах
   • Метрики производительности распределённой системы
 """
-import random, statistics
+import os
+import sys
+from dataclasses import replace
+
 import matplotlib.pyplot as plt
 import numpy as np
 
-class DistributedSystemSimulator:
-    def __init__(self, n_edge_devices=100, n_fog_nodes=10, n_cloud_servers=3):
-        self.n_edge_devices = n_edge_devices
-        self.n_fog_nodes = n_fog_nodes
-        self.n_cloud_servers = n_cloud_servers
-        
-        # Инициализация устройств
-        self.edge_devices = self._init_edge_devices()
-        self.fog_nodes = self._init_fog_nodes()
-        self.cloud_servers = self._init_cloud_servers()
-    
-    def _init_edge_devices(self):
-        """Инициализация краевых устройств (стационарные и мобильные)"""
-        devices = []
-        for i in range(self.n_edge_devices):
-            device_type = "стационарный" if i % 2 == 0 else "мобильный"
-            # Мобильные устройства имеют немного другие характеристики
-            if device_type == "мобильный":
-                processing_range = (8, 20)  # Немного выше задержка
-                network_range = (8, 20)      # Менее стабильное соединение
-            else:
-                processing_range = (5, 15)  # Стабильная задержка
-                network_range = (5, 15)      # Стабильное соединение
-                
-            devices.append({
-                'id': f"Edge_{i}",
-                'type': device_type,
-                'processing_delay': random.randint(*processing_range),  # мс
-                'network_delay': random.randint(*network_range),        # мс
-                'assigned_fog': random.randint(0, self.n_fog_nodes-1)
-            })
-        return devices
-    
-    def _init_fog_nodes(self):
-        """Инициализация Fog-узлов"""
-        nodes = []
-        for i in range(self.n_fog_nodes):
-            # Разные Fog-узлы могут иметь разную производительность
-            capacity_factor = random.uniform(0.8, 1.2)
-            nodes.append({
-                'id': f"Fog_{i}",
-                'processing_delay_range': (int(30 * capacity_factor), int(80 * capacity_factor)),
-                'queue_capacity': 400,
-                'current_queue': 0,
-                'assigned_cloud': random.randint(0, self.n_cloud_servers-1),
-                'processed_tasks': 0
-            })
-        return nodes
-    
-    def _init_cloud_servers(self):
-        """Инициализация облачных серверов"""
-        servers = []
-        for i in range(self.n_cloud_servers):
-            # Облачные серверы обычно более производительные
-            servers.append({
-                'id': f"Cloud_{i}",
-                'processing_delay_range': (10, 30),  # мс
-                'storage_capacity': 1000,
-                'processed_tasks': 0
-            })
-        return servers
-
-def simulate_ethernet_architecture_custom(n_tasks=100, simulator=None, seed=42):
-    """
-    Симуляция эталонной архитектуры с кастомным симулятором
-    """
-    if simulator is None:
-        simulator = DistributedSystemSimulator()
-    
-    random.seed(seed)
-    tasks = []
-    
-    for task_id in range(n_tasks):
-        # Случайное краевое устройство генерирует задачу
-        edge_device = random.choice(simulator.edge_devices)
-        fog_node = simulator.fog_nodes[edge_device['assigned_fog']]
-        cloud_server = simulator.cloud_servers[fog_node['assigned_cloud']]
-        
-        # Задержки на каждом этапе
-        edge_processing = edge_device['processing_delay']
-        edge_to_fog_network = edge_device['network_delay']
-        
-        fog_processing = random.randint(*fog_node['processing_delay_range'])
-        fog_queue_delay = fog_node['current_queue'] * 2  # 2 мс на задачу в очереди
-        
-        fog_to_cloud_network = random.randint(20, 50)  # Более высокая задержка до облака
-        cloud_processing = random.randint(*cloud_server['processing_delay_range'])
-        
-        # Обновление очереди Fog-узла
-        if fog_node['current_queue'] < fog_node['queue_capacity']:
-            fog_node['current_queue'] += 1
-        else:
-            fog_queue_delay += 10  # Штраф за переполнение очереди
-        
-        # Общая сквозная задержка
-        end_to_end_latency = (edge_processing + edge_to_fog_network + 
-                             fog_processing + fog_queue_delay + 
-                             fog_to_cloud_network + cloud_processing)
-        
-        tasks.append({
-            'task_id': task_id,
-            'edge_device': edge_device['id'],
-            'edge_type': edge_device['type'],
-            'fog_node': fog_node['id'],
-            'cloud_server': cloud_server['id'],
-            'edge_processing': edge_processing,
-            'edge_to_fog_network': edge_to_fog_network,
-            'fog_processing': fog_processing,
-            'fog_queue_delay': fog_queue_delay,
-            'fog_to_cloud_network': fog_to_cloud_network,
-            'cloud_processing': cloud_processing,
-            'end_to_end_latency': end_to_end_latency
-        })
-        
-        # Уменьшение очереди Fog-узла (обработка задач)
-        if random.random() < 0.3:  # 30% chance to process a task from queue
-            if fog_node['current_queue'] > 0:
-                fog_node['current_queue'] -= 1
-                fog_node['processed_tasks'] += 1
-        
-        # Обновление статистики облачного сервера
-        cloud_server['processed_tasks'] += 1
-    
-    return tasks
+from arrivals import ARRIVAL_MODELS
+from offload import OFFLOAD_NAMES, OffloadPolicy
+from onlinestats import PerformanceAccumulator
+# Общий модуль графиков plotting.py лежит в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from plotting import MAX_POINTS, decimate, finish_figure, get_figure
+from runstore import RunStore
+from timeline import windowed_metrics
+from simkernel import ENGINES, REFERENCE_SCENARIO, DistributedSystemSimulator
 
 def analyze_performance(tasks):
-    """Анализ производительности системы"""
-    latencies = [task['end_to_end_latency'] for task in tasks]
-    edge_latencies = [task['edge_processing'] for task in tasks]
-    fog_latencies = [task['fog_processing'] + task['fog_queue_delay'] for task in tasks]
-    cloud_latencies = [task['cloud_processing'] for task in tasks]
-    network_latencies = [task['edge_to_fog_network'] + task['fog_to_cloud_network'] for task in tasks]
-    
-    # Статистика
+    """Анализ производительности системы (tasks — TaskTable или PerformanceAccumulator)"""
+    if isinstance(tasks, PerformanceAccumulator):
+        return tasks.stats()
+    
+    latencies = tasks['end_to_end_latency'].astype(np.float64)
+    edge_latencies = tasks['edge_processing']
+    fog_latencies = tasks['fog_processing'] + tasks['fog_queue_delay']
+    cloud_latencies = tasks['cloud_processing']
+    if 'cloud_queue_delay' in tasks:
+        cloud_latencies = cloud_latencies + tasks['cloud_queue_delay']
+    network_latencies = tasks['edge_to_fog_network'] + tasks['fog_to_cloud_network']
+    
+    # Статистика (перцентили — тем же методом, что statistics.quantiles)
+    p50, p95, p99, p999 = np.percentile(latencies, [50, 95, 99, 99.9], method='weibull')
     stats = {
-        'avg_end_to_end': statistics.mean(latencies),
-        'p95_end_to_end': statistics.quantiles(latencies, n=20)[18],
-        'p99_end_to_end': statistics.quantiles(latencies, n=100)[98],
-        'avg_edge': statistics.mean(edge_latencies),
-        'avg_fog': statistics.mean(fog_latencies),
-        'avg_cloud': statistics.mean(cloud_latencies),
-        'avg_network': statistics.mean(network_latencies),
-        'max_latency': max(latencies),
-        'min_latency': min(latencies),
-        'std_latency': statistics.stdev(latencies) if len(latencies) > 1 else 0
+        'avg_end_to_end': float(latencies.mean()),
+        'p50_end_to_end': float(p50),
+        'p95_end_to_end': float(p95),
+        'p99_end_to_end': float(p99),
+        'p999_end_to_end': float(p999),
+        'avg_edge': float(edge_latencies.mean(dtype=np.float64)),
+        'avg_fog': float(fog_latencies.mean(dtype=np.float64)),
+        'avg_fog_queue': float(tasks['fog_queue_delay'].mean(dtype=np.float64)),
+        'avg_cloud': float(cloud_latencies.mean(dtype=np.float64)),
+        'avg_network': float(network_latencies.mean(dtype=np.float64)),
+        'max_latency': float(latencies.max()),
+        'min_latency': float(latencies.min()),
+        'std_latency': float(latencies.std(ddof=1)) if len(latencies) > 1 else 0
     }
     
     return stats
 
-def plot_comprehensive_results(tasks, stats, config):
-    """Построение комплексных графиков результатов"""
+def plot_comprehensive_results(tasks, stats, config, timeline=None):
+    """Построение комплексных графиков результатов (timeline — метрики по окнам времени)"""
     
-    plt.figure(figsize=(15, 10))
+    fig, _ = get_figure('comprehensive_results', 2, 3, figsize=(15, 10))
     
     # График 1: Сквозная задержка по задачам
     plt.subplot(2, 3, 1)
-    task_ids = [task['task_id'] for task in tasks]
-    latencies = [task['end_to_end_latency'] for task in tasks]
-    plt.plot(task_ids, latencies, 'b-', alpha=0.7, linewidth=1)
+    task_ids = tasks.task_id
+    latencies = tasks['end_to_end_latency']
+    plt.plot(*decimate(task_ids, latencies), 'b-', alpha=0.7, linewidth=1)
     plt.axhline(y=stats['avg_end_to_end'], color='r', linestyle='--', label=f'Средняя: {stats["avg_end_to_end"]:.1f}мс')
     plt.xlabel('Номер задачи / Task #')
     plt.ylabel('Сквозная задержка, мс / End-to-End Latency, ms')
@@ -196,12 +93,13 @@ def plot_comprehensive_results(tasks, stats, config):
     
     # График 3: Сравнение стационарных и мобильных устройств
     plt.subplot(2, 3, 3)
-    stationary_latencies = [task['end_to_end_latency'] for task in tasks if task['edge_type'] == 'стационарный']
-    mobile_latencies = [task['end_to_end_latency'] for task in tasks if task['edge_type'] == 'мобильный']
+    stationary_latencies = latencies[tasks.type_mask('стационарный')]
+    mobile_latencies = latencies[tasks.type_mask('мобильный')]
     
     box_data = [stationary_latencies, mobile_latencies]
     box_labels = ['Стационарные\nStationary', 'Мобильные\nMobile']
-    box_plot = plt.boxplot(box_data, labels=box_labels, patch_artist=True)
+    box_plot = plt.boxplot(box_data, patch_artist=True, showfliers=len(latencies) <= MAX_POINTS)
+    plt.xticks([1, 2], box_labels)
     
     # Цвета для boxplot
     colors = ['lightgreen', 'lightblue']
@@ -211,13 +109,28 @@ def plot_comprehensive_results(tasks, stats, config):
     plt.ylabel('Задержка, мс / Latency, ms')
     plt.title('Сравнение типов устройств\nDevice Type Comparison')
     
-    # График 4: Накопительная задержка
-    plt.subplot(2, 3, 4)
-    cumulative_latency = np.cumsum([task['end_to_end_latency'] for task in tasks])
-    plt.plot(task_ids, cumulative_latency, 'purple', linewidth=2)
-    plt.xlabel('Номер задачи / Task #')
-    plt.ylabel('Накопительная задержка, мс / Cumulative Latency, ms')
-    plt.title('Накопительная задержка\nCumulative Latency')
+    # График 4: Пропускная способность и загрузка во времени (или накопительная задержка)
+    ax4 = plt.subplot(2, 3, 4)
+    if timeline is not None:
+        seconds = timeline['window_start'] / 1000
+        ax4.plot(seconds, timeline['arrivals'], color='gray', alpha=0.6, label='Поступление')
+        ax4.plot(seconds, timeline['throughput'], 'purple', linewidth=2, label='Пропускная способность')
+        ax4.set_xlabel('Время, с / Time, s')
+        ax4.set_ylabel('Задач/с / Tasks/s')
+        utilization = ax4.twinx()
+        utilization.plot(seconds, timeline['fog_utilization'], 'g--', label='Загрузка Fog')
+        utilization.plot(seconds, timeline['cloud_utilization'], 'b--', label='Загрузка Cloud')
+        utilization.set_ylim(0, 1.05)
+        utilization.set_ylabel('Загрузка / Utilization')
+        lines = ax4.get_legend_handles_labels()[0] + utilization.get_legend_handles_labels()[0]
+        ax4.legend(lines, [line.get_label() for line in lines], fontsize=8)
+        plt.title('Пропускная способность и загрузка\nThroughput and Utilization')
+    else:
+        cumulative_latency = np.cumsum(latencies)
+        plt.plot(*decimate(task_ids, cumulative_latency), 'purple', linewidth=2)
+        plt.xlabel('Номер задачи / Task #')
+        plt.ylabel('Накопительная задержка, мс / Cumulative Latency, ms')
+        plt.title('Накопительная задержка\nCumulative Latency')
     plt.grid(True, alpha=0.3)
     
     # График 5: Гистограмма распределения задержек
@@ -248,9 +161,9 @@ def plot_comprehensive_results(tasks, stats, config):
              verticalalignment='top', bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray"))
     
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'comprehensive_results')
 
-def print_detailed_metrics(tasks, stats, config):
+def print_detailed_metrics(tasks, stats, config, timeline=None):
     """Вывод детализированных метрик"""
     print("=" * 70)
     print("МЕТРИКИ ЭТАЛОННОЙ АРХИТЕКТУРЫ / REFERENCE ARCHITECTURE METRICS")
@@ -275,22 +188,44 @@ def print_detailed_metrics(tasks, stats, config):
     print(f"  Туманный уровень (Fog): {stats['avg_fog']:.2f} мс ({stats['avg_fog']/stats['avg_end_to_end']*100:.1f}%)") 
     print(f"  Облачный уровень (Cloud): {stats['avg_cloud']:.2f} мс ({stats['avg_cloud']/stats['avg_end_to_end']*100:.1f}%)")
     print(f"  Сетевые задержки: {stats['avg_network']:.2f} мс ({stats['avg_network']/stats['avg_end_to_end']*100:.1f}%)")
+    if 'cloud_queue_delay' in tasks:
+        print(f"  Ожидание в очереди облака: {tasks['cloud_queue_delay'].mean(dtype=np.float64):.2f} мс")
     
     # Анализ по типам устройств
-    stationary_tasks = [t for t in tasks if t['edge_type'] == 'стационарный']
-    mobile_tasks = [t for t in tasks if t['edge_type'] == 'мобильный']
+    latencies = tasks['end_to_end_latency']
+    stationary_latencies = latencies[tasks.type_mask('стационарный')]
+    mobile_latencies = latencies[tasks.type_mask('мобильный')]
     
-    if stationary_tasks:
-        avg_stationary = statistics.mean([t['end_to_end_latency'] for t in stationary_tasks])
+    if len(stationary_latencies):
+        avg_stationary = stationary_latencies.mean()
         print(f"\nСТАЦИОНАРНЫЕ УСТРОЙСТВА / STATIONARY DEVICES:")
-        print(f"  Количество задач: {len(stationary_tasks)} ({len(stationary_tasks)/len(tasks)*100:.1f}%)")
+        print(f"  Количество задач: {len(stationary_latencies)} ({len(stationary_latencies)/len(tasks)*100:.1f}%)")
         print(f"  Средняя задержка: {avg_stationary:.2f} мс")
     
-    if mobile_tasks:
-        avg_mobile = statistics.mean([t['end_to_end_latency'] for t in mobile_tasks])
+    if len(mobile_latencies):
+        avg_mobile = mobile_latencies.mean()
         print(f"\nМОБИЛЬНЫЕ УСТРОЙСТВА / MOBILE DEVICES:")
-        print(f"  Количество задач: {len(mobile_tasks)} ({len(mobile_tasks)/len(tasks)*100:.1f}%)")
+        print(f"  Количество задач: {len(mobile_latencies)} ({len(mobile_latencies)/len(tasks)*100:.1f}%)")
         print(f"  Средняя задержка: {avg_mobile:.2f} мс")
+    
+    if timeline is not None:
+        print(f"\nПРОПУСКНАЯ СПОСОБНОСТЬ / THROUGHPUT:")
+        print(f"  Длительность: {timeline['duration_ms'] / 1000:.1f} с")
+        print(f"  Средняя: {timeline['throughput_s']:.1f} задач/с, "
+              f"пиковая: {timeline['throughput'].max():.0f} задач/с")
+        print(f"  Загрузка Fog: средняя {timeline['fog_utilization'].mean():.1%}, "
+              f"пиковая {timeline['fog_utilization'].max():.1%}")
+        print(f"  Загрузка Cloud: средняя {timeline['cloud_utilization'].mean():.1%}, "
+              f"пиковая {timeline['cloud_utilization'].max():.1%}")
+        print(f"  Худшее окно: P95 задержки {np.nanmax(timeline['latency_p']):.2f} мс")
+    
+    if 'offload' in tasks:
+        print(f"\nРАЗГРУЗКА FOG-УЗЛОВ / FOG OFFLOADING:")
+        counts = np.bincount(tasks['offload'], minlength=len(OFFLOAD_NAMES))
+        for code, (name, count) in enumerate(zip(OFFLOAD_NAMES, counts)):
+            if count:
+                print(f"  {name}: {count} задач ({count/len(tasks)*100:.1f}%), "
+                      f"средняя задержка {latencies[tasks['offload'] == code].mean():.2f} мс")
 
 def simulate_custom_config():
     """Функция для быстрой настройки конфигурации системы"""
@@ -300,8 +235,16 @@ def simulate_custom_config():
         'edge_devices': 100,      # ↦ Количество краевых устройств (100-10000)
         'fog_nodes': 20,          # ↦ Количество Fog-узлов (100-10000)
         'cloud_servers': 3,       # ↦ Количество облачных серверов (1-100)
+        'cloud_concurrency': 1,   # ↦ Параллельных обработчиков на облачном сервере
+        'cloud_drain_probability': None,  # ↦ Очередь облака в loop/vectorized: вероятность завершения за шаг (напр. 0.4; None — выкл.)
         'tasks': 200,             # ↦ Количество задач для симуляции
-        'seed': 42               # ↦ Seed для воспроизводимости результатов
+        'seed': 42,              # ↦ Seed для воспроизводимости результатов
+        'engine': 'loop',        # ↦ Движок симуляции: 'loop', 'vectorized' или 'event'
+        'offload': False,        # ↦ True — разгрузка перегруженных Fog на соседей/в облако (loop, event)
+        'arrivals': None,        # ↦ Поток во времени: 'poisson', 'mmpp', 'diurnal' (только event)
+        'window_ms': 1000,       # ↦ Окно метрик во времени, мс (event)
+        'run_store': None,       # ↦ Каталог хранилища прогонов (None — не сохранять)
+        'from_store': False      # ↦ True — взять сохранённый прогон вместо новой симуляции
     }
     
     print(f"⚙️  Загружена конфигурация:")
@@ -317,20 +260,37 @@ def simulate_custom_config():
     if CONFIG['fog_nodes'] < CONFIG['cloud_servers']:
         print("⚠️  Предупреждение: Облачных серверов больше чем Fog-узлов")
     
+    store = RunStore(CONFIG['run_store']) if CONFIG['run_store'] else None
+    run_name = f"edge{CONFIG['edge_devices']}_fog{CONFIG['fog_nodes']}_cloud{CONFIG['cloud_servers']}_" \
+               f"c{CONFIG['cloud_concurrency']}_tasks{CONFIG['tasks']}_seed{CONFIG['seed']}_{CONFIG['engine']}" \
+               f"{'_cq' + str(CONFIG['cloud_drain_probability']) if CONFIG['cloud_drain_probability'] is not None else ''}" \
+               f"{'_offload' if CONFIG['offload'] else ''}" \
+               f"{'_' + CONFIG['arrivals'] if CONFIG['arrivals'] else ''}"
+    if CONFIG['from_store'] and store is not None and run_name in store:
+        print(f"📂 Результаты загружены из хранилища: {run_name}")
+        return store.load(run_name).tasks, None, CONFIG
+    
     # Инициализация симулятора
     simulator = DistributedSystemSimulator(
         n_edge_devices=CONFIG['edge_devices'],
         n_fog_nodes=CONFIG['fog_nodes'],
-        n_cloud_servers=CONFIG['cloud_servers']
+        n_cloud_servers=CONFIG['cloud_servers'],
+        scenario=replace(REFERENCE_SCENARIO, cloud_concurrency=CONFIG['cloud_concurrency'],
+                         cloud_drain_probability=CONFIG['cloud_drain_probability'],
+                         offload=OffloadPolicy() if CONFIG['offload'] else None,
+                         arrivals=ARRIVAL_MODELS[CONFIG['arrivals']] if CONFIG['arrivals'] else None)
     )
     
     # Запуск симуляции
-    tasks = simulate_ethernet_architecture_custom(
+    tasks = ENGINES[CONFIG['engine']](
         n_tasks=CONFIG['tasks'],
         simulator=simulator,
         seed=CONFIG['seed']
     )
     
+    if store is not None:
+        store.save(run_name, tasks, analyze_performance(tasks), CONFIG)
+    
     return tasks, simulator, CONFIG
 
 def main():
@@ -345,12 +305,16 @@ def main():
     
     # Анализ производительности
     stats = analyze_performance(tasks)
+    # Метрики во времени — только при известных моментах поступления и топологии
+    timeline = None
+    if simulator is not None and 'arrival_time' in tasks:
+        timeline = windowed_metrics(tasks, simulator, config['window_ms'])
     
     # Вывод результатов
-    print_detailed_metrics(tasks, stats, config)
+    print_detailed_metrics(tasks, stats, config, timeline)
     
     # Построение графиков
-    plot_comprehensive_results(tasks, stats, config)
+    plot_comprehensive_results(tasks, stats, config, timeline)
     
     print(f"\n✅ СИМУЛЯЦИЯ ЗАВЕРШЕНА УСПЕШНО!")
     print(f"📊 Для изменения конфигурации отредактируйте словарь CONFIG в функции simulate_custom_config()")
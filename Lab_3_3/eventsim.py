@@ -0,0 +1,311 @@
+"""
+eventsim.py
+
+Дискретно-событийная симуляция архитектуры Край → Туман → Облако.
+
+Модельное время продвигается по календарю событий на двоичной куче
+(heapq): планирование и извлечение события стоят O(log n). В куче
+находятся только ожидающие события задач, которые сейчас «в полёте»,
+поэтому память ограничена числом одновременно обрабатываемых задач,
+а не длиной прогона.
+
+События на каждом Fog-узле и облачном сервере:
+  • ARRIVAL       — задача пришла на узел
+  • SERVICE_START — задача взята в обработку (после ожидания в очереди)
+  • DEPARTURE     — обработка завершена, задача уходит дальше
+"""
+import heapq
+import random
+from collections import deque
+from itertools import repeat
+
+import numpy as np
+
+from arrivals import arrival_blocks
+from offload import CLOUD as OFFLOAD_CLOUD, SIBLING, STAY, decide, limits
+from tasktable import TaskTable
+
+# Типы событий
+GENERATE, ARRIVAL, SERVICE_START, DEPARTURE = range(4)
+# Уровни архитектуры
+FOG, CLOUD = 0, 1
+
+class EventCalendar:
+    """Календарь событий на двоичной куче"""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0  # порядок планирования — разрешает одновременные события детерминированно
+        self.processed = 0
+
+    def schedule(self, time, kind, tier, node, task):
+        heapq.heappush(self._heap, (time, self._seq, kind, tier, node, task))
+        self._seq += 1
+
+    def pop(self):
+        self.processed += 1
+        return heapq.heappop(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class ServiceStation:
+    """Узел обслуживания: servers параллельных обработчиков и FIFO-очередь ожидания"""
+
+    __slots__ = ('servers', 'busy', 'waiting', 'queue_capacity',
+                 'processed_tasks', 'overflows', 'busy_time')
+
+    def __init__(self, servers=1, queue_capacity=None):
+        self.servers = servers
+        self.busy = 0
+        self.waiting = deque()
+        self.queue_capacity = queue_capacity  # None — очередь без ограничения
+        self.processed_tasks = 0
+        self.overflows = 0
+        self.busy_time = 0.0
+
+    def is_full(self):
+        return self.queue_capacity is not None and len(self.waiting) >= self.queue_capacity
+
+
+def _interarrivals(blocks):
+    """
+    Блоки (интервал до следующей задачи, устройство, доп. задержка Edge → Fog)
+    из блоков (время поступления, устройство[, доп. задержка]) —
+    arrivals.arrival_blocks или трассы (tracereplay)
+    """
+    block = next(blocks, None)
+    while block is not None:
+        following_block = next(blocks, None)
+        times = block[0]
+        following = times[-1] if following_block is None else following_block[0][0]
+        interarrival = np.diff(times, append=following)
+        if len(interarrival) and interarrival.min() < 0:
+            raise ValueError("Времена поступления задач должны не убывать")
+        yield interarrival, block[1], block[2] if len(block) > 2 else None
+        block = following_block
+
+
+def _draw_block(rng, size, topology, arrivals=None):
+    """Случайные величины для очередного блока задач (одним проходом NumPy)"""
+    transfer = None
+    if arrivals is None:
+        edge_idx = rng.integers(0, len(topology['edge_fog']), size=size)
+        interarrival = None
+    else:
+        interarrival, edge_idx, transfer = next(arrivals)
+        size = len(edge_idx)
+    fog_idx = topology['edge_fog'][edge_idx]
+    cloud_idx = topology['fog_cloud'][fog_idx]
+    return zip(
+        (rng.exponential(topology['mean_interarrival_ms'], size=size) if interarrival is None
+         else interarrival).tolist(),
+        edge_idx.tolist(),
+        fog_idx.tolist(),
+        cloud_idx.tolist(),
+        rng.integers(topology['fog_low'][fog_idx], topology['fog_high'][fog_idx], endpoint=True).tolist(),
+        rng.integers(*topology['fog_to_cloud_range'], size=size, endpoint=True).tolist(),
+        rng.integers(topology['cloud_low'][cloud_idx], topology['cloud_high'][cloud_idx], endpoint=True).tolist(),
+        repeat(0.0) if transfer is None else np.asarray(transfer, dtype=np.float64).tolist(),
+    )
+
+
+def simulate_event_driven(n_tasks=100, simulator=None, seed=42, mean_interarrival_ms=10.0,
+                          cloud_concurrency=None, record=True, block_size=65536, accumulator=None,
+                          arrival_stream=None):
+    """
+    Дискретно-событийная симуляция поверх DistributedSystemSimulator.
+
+    Задачи порождаются краевыми устройствами пуассоновским потоком со
+    средним интервалом mean_interarrival_ms или, если задан
+    scenario.arrivals, по этой модели потока (arrivals.py; время
+    отсчитывается от первой задачи). arrival_stream — готовые блоки
+    (время поступления, мс; индекс устройства; доп. задержка Edge → Fog, мс
+    или None) не меньше чем на n_tasks задач (иначе ValueError), например
+    записанная трасса (tracereplay); он заменяет обе модели потока.
+    Каждый Fog-узел — один обработчик с очередью queue_capacity, каждый
+    облачный сервер — cloud_concurrency обработчиков
+    (None — scenario.cloud_concurrency) и не больше
+    storage_capacity задач в обработке и в очереди. Задержка очереди —
+    реальное время ожидания обработки. Если очередь узла заполнена,
+    задача отправляется повторно через scenario.overflow_penalty_ms; при
+    заданной scenario.offload задача, пришедшая на загруженный узел,
+    уходит на соседний Fog-узел или в облако (см. offload.py).
+
+    accumulator (PerformanceAccumulator) обновляется по завершении каждой
+    задачи. Возвращает TaskTable (со столбцами arrival_time и
+    cloud_queue_delay) или None при record=False — тогда память не зависит
+    от n_tasks. seed=None — seed берётся из текущей последовательности random.
+    """
+    if simulator is None:
+        from simkernel import DistributedSystemSimulator
+        simulator = DistributedSystemSimulator()
+    scenario = simulator.scenario
+
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    edges, fogs, clouds = simulator.edge_devices, simulator.fog_nodes, simulator.cloud_servers
+    topology = {
+        'edge_fog': edges.assigned_fog,
+        'fog_cloud': fogs.assigned_cloud,
+        'fog_low': fogs.processing_low,
+        'fog_high': fogs.processing_high,
+        'cloud_low': clouds.processing_low,
+        'cloud_high': clouds.processing_high,
+        'fog_to_cloud_range': scenario.fog_to_cloud_range,
+        'mean_interarrival_ms': mean_interarrival_ms,
+    }
+    retry_ms = scenario.overflow_penalty_ms
+    policy = scenario.offload
+    if policy is not None:
+        offload_limits = limits(policy, fogs.queue_capacity.tolist())
+        offload_trigger = offload_limits[2]
+        fog_cloud = fogs.assigned_cloud.tolist()
+        fog_low, fog_high = fogs.processing_low.tolist(), fogs.processing_high.tolist()
+        fog_to_sibling = [0] * len(fogs)
+        fog_to_cloud = [0] * len(fogs)
+
+        def fog_load(node):
+            station = stations[FOG][node]
+            return station.busy + len(station.waiting)
+
+        def randrange(n):
+            return int(rng.integers(n))
+    if cloud_concurrency is None:
+        cloud_servers = clouds.concurrency.tolist()
+    else:
+        cloud_servers = [cloud_concurrency] * len(clouds)
+    edge_processing = edges.processing_delay.tolist()
+    edge_network = edges.network_delay.tolist()
+    edge_type = edges.type.tolist()
+
+    stations = (
+        [ServiceStation(1, capacity) for capacity in fogs.queue_capacity.tolist()],
+        [ServiceStation(servers, max(0, capacity - servers))
+         for servers, capacity in zip(cloud_servers, clouds.storage_capacity.tolist())],
+    )
+    optional = ('arrival_time', 'cloud_queue_delay') + (('offload',) if policy else ())
+    tasks = TaskTable.allocate(n_tasks, optional=optional) if record else None
+
+    # Состояние задач «в полёте»:
+    # [создание, edge, fog, cloud, обработка fog, сеть fog→cloud, обработка cloud,
+    #  приход на fog, ожидание на fog, приход в облако, ожидание в облаке, решение разгрузки,
+    #  доп. задержка Edge → Fog]
+    in_flight = {}
+    calendar = EventCalendar()
+    block = iter(())
+    arrivals = None
+    if arrival_stream is not None:
+        arrivals = _interarrivals(iter(arrival_stream))
+    elif scenario.arrivals is not None:
+        arrivals = _interarrivals(arrival_blocks(scenario.arrivals, rng, len(edges), n_tasks, block_size))
+    if n_tasks:
+        calendar.schedule(0.0, GENERATE, FOG, 0, 0)
+
+    while calendar:
+        time, _, kind, tier, node, task = calendar.pop()
+
+        if kind == GENERATE:
+            draws = next(block, None)
+            if draws is None:
+                try:
+                    block = _draw_block(rng, min(block_size, n_tasks - task), topology, arrivals)
+                    draws = next(block)
+                except StopIteration:
+                    raise ValueError(f"Поток поступлений содержит {task} задач, а n_tasks={n_tasks}") from None
+            interarrival, edge, fog, cloud, fog_service, network, cloud_service, transfer = draws
+            in_flight[task] = [time, edge, fog, cloud, fog_service, network, cloud_service,
+                               None, 0.0, None, 0.0, STAY, transfer]
+            calendar.schedule(time + edge_processing[edge] + edge_network[edge] + transfer, ARRIVAL, FOG, fog, task)
+            if task + 1 < n_tasks:
+                calendar.schedule(time + interarrival, GENERATE, FOG, 0, task + 1)
+
+        elif kind == ARRIVAL:
+            state = in_flight[task]
+            if (policy is not None and tier == FOG and state[11] == STAY
+                    and fog_load(node) >= offload_trigger[node]):
+                offload, sibling = decide(policy, node, fog_load, offload_limits, randrange)
+                if offload == SIBLING:
+                    # Перенаправление соседнему Fog-узлу (облако — по его назначению)
+                    fog_to_sibling[node] += 1
+                    state[2], state[3], state[11] = sibling, fog_cloud[sibling], SIBLING
+                    state[4] = int(rng.integers(fog_low[sibling], fog_high[sibling], endpoint=True))
+                    calendar.schedule(time + policy.sibling_hop_ms, ARRIVAL, FOG, sibling, task)
+                    continue
+                if offload == OFFLOAD_CLOUD:
+                    # Передача в облако: Fog-этап выполняет облачный сервер
+                    fog_to_cloud[node] += 1
+                    state[6] += state[4] / policy.cloud_speedup
+                    state[4], state[11] = 0, OFFLOAD_CLOUD
+                    calendar.schedule(time + state[5], ARRIVAL, CLOUD, state[3], task)
+                    continue
+            station = stations[tier][node]
+            if state[7 + 2 * tier] is None:
+                state[7 + 2 * tier] = time
+            if station.busy < station.servers:
+                station.busy += 1
+                calendar.schedule(time, SERVICE_START, tier, node, task)
+            elif station.is_full():
+                station.overflows += 1
+                calendar.schedule(time + retry_ms, ARRIVAL, tier, node, task)
+            else:
+                station.waiting.append(task)
+
+        elif kind == SERVICE_START:
+            state = in_flight[task]
+            state[8 + 2 * tier] = time - state[7 + 2 * tier]
+            service = state[4] if tier == FOG else state[6]
+            calendar.schedule(time + service, DEPARTURE, tier, node, task)
+
+        else:  # DEPARTURE
+            state = in_flight[task]
+            station = stations[tier][node]
+            station.processed_tasks += 1
+            station.busy_time += state[4] if tier == FOG else state[6]
+            if station.waiting:
+                calendar.schedule(time, SERVICE_START, tier, node, station.waiting.popleft())
+            else:
+                station.busy -= 1
+
+            if tier == FOG:
+                calendar.schedule(time + state[5], ARRIVAL, CLOUD, state[3], task)
+            else:
+                del in_flight[task]
+                (created, edge, fog, cloud, fog_service, network, cloud_service,
+                 _, fog_wait, _, cloud_wait, offload, transfer) = state
+                edge_to_fog = edge_network[edge] + transfer + (policy.sibling_hop_ms if offload == SIBLING else 0)
+                if accumulator is not None:
+                    accumulator.add(edge_processing[edge], fog_service, fog_wait, cloud_service + cloud_wait,
+                                    edge_to_fog + network, time - created)
+                if record:
+                    tasks['edge_device'][task] = edge
+                    tasks['edge_type'][task] = edge_type[edge]
+                    tasks['fog_node'][task] = fog
+                    tasks['cloud_server'][task] = cloud
+                    tasks['edge_processing'][task] = edge_processing[edge]
+                    tasks['edge_to_fog_network'][task] = edge_to_fog
+                    tasks['fog_processing'][task] = fog_service
+                    tasks['fog_queue_delay'][task] = fog_wait
+                    tasks['fog_to_cloud_network'][task] = network
+                    tasks['cloud_processing'][task] = cloud_service
+                    tasks['cloud_queue_delay'][task] = cloud_wait
+                    tasks['end_to_end_latency'][task] = time - created
+                    tasks['arrival_time'][task] = created
+                    if policy is not None:
+                        tasks['offload'][task] = offload
+
+    # Итоговая статистика узлов — в массивы топологии симулятора
+    fog_stations, cloud_stations = stations
+    fogs.current_queue[:] = [len(station.waiting) for station in fog_stations]
+    fogs.processed_tasks += [station.processed_tasks for station in fog_stations]
+    fogs.queue_overflows += [station.overflows for station in fog_stations]
+    fogs.busy_time += [station.busy_time for station in fog_stations]
+    if policy is not None:
+        fogs.offloaded_sibling += fog_to_sibling
+        fogs.offloaded_cloud += fog_to_cloud
+    clouds.processed_tasks += [station.processed_tasks for station in cloud_stations]
+    clouds.busy_time += [station.busy_time for station in cloud_stations]
+    clouds.current_queue[:] = [len(station.waiting) for station in cloud_stations]
+    clouds.queue_overflows += [station.overflows for station in cloud_stations]
+
+    return tasks
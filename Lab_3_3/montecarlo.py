@@ -0,0 +1,102 @@
+"""
+montecarlo.py
+
+Метод Монте-Карло: независимые повторения прогона с разными seed.
+
+Seed повторений порождаются из одного seed через
+numpy.random.SeedSequence.spawn, поэтому набор повторений
+воспроизводим и потоки случайных чисел не пересекаются. Повторения
+считаются пачками в пуле процессов; после каждой пачки для каждой
+метрики вычисляется доверительный интервал (t-распределение), и прогон
+останавливается, как только полуширина интервала всех метрик не
+превышает заданной — вычисления тратятся только там, где велика
+дисперсия.
+"""
+import math
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def t_quantile(p, df):
+    """
+    Квантиль распределения Стьюдента (разложение Корниша — Фишера по
+    нормальному квантилю; погрешность < 0.01 при df >= 4).
+    """
+    z = statistics.NormalDist().inv_cdf(p)
+    if math.isinf(df):
+        return z
+    return (z + (z ** 3 + z) / (4 * df)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def confidence_interval(values, confidence=0.95):
+    """Среднее и доверительный интервал: словарь mean, std, half_width, low, high, n"""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    half_width = t_quantile(0.5 + confidence / 2, n - 1) * std / math.sqrt(n) if n > 1 else math.inf
+    return {'mean': mean, 'std': std, 'half_width': half_width,
+            'low': mean - half_width, 'high': mean + half_width, 'n': n}
+
+
+def spawn_seeds(seed, count, start=0):
+    """count целых seed для повторений start .. start+count-1"""
+    children = np.random.SeedSequence(seed).spawn(start + count)[start:]
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def run_replications(job, seed=42, target_half_width=None, relative=True, metrics=None,
+                     confidence=0.95, min_replications=5, max_replications=100,
+                     max_workers=None):
+    """
+    Повторять job(seed) -> {метрика: значение} до достижения точности.
+
+    target_half_width — допустимая полуширина интервала: число для всех
+    метрик или словарь {метрика: число}; при relative=True — доля от
+    |среднего| (0.01 — ±1 %). None — ровно max_replications повторений.
+    metrics — метрики, по которым проверяется остановка (None — все).
+    Возвращает (summary, samples): summary[метрика] — результат
+    confidence_interval, samples[метрика] — значения по повторениям.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    samples = {}
+    done = 0
+    batch = max(min_replications, 1)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while done < max_replications:
+            seeds = spawn_seeds(seed, min(batch, max_replications - done), start=done)
+            results = pool.map(job, seeds) if pool is not None else map(job, seeds)
+            for result in results:
+                for name, value in result.items():
+                    samples.setdefault(name, []).append(value)
+            done += len(seeds)
+            batch = workers
+
+            if target_half_width is None or done < min_replications:
+                continue
+            if _converged(samples, target_half_width, relative, metrics, confidence):
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    summary = {name: confidence_interval(values, confidence) for name, values in samples.items()}
+    return summary, {name: np.asarray(values) for name, values in samples.items()}
+
+
+def _converged(samples, target_half_width, relative, metrics, confidence):
+    for name in metrics or samples:
+        target = target_half_width.get(name) if isinstance(target_half_width, dict) else target_half_width
+        if target is None:
+            continue
+        interval = confidence_interval(samples[name], confidence)
+        limit = target * abs(interval['mean']) if relative else target
+        if interval['half_width'] > limit:
+            return False
+    return True
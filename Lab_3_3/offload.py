@@ -0,0 +1,79 @@
+"""
+offload.py
+
+Политика разгрузки перегруженных Fog-узлов во время симуляции.
+
+Реализует переход диаграммы состояний Lab_3_1 (statediag.py)
+«Перегрузка → Передача в облако»: вместо постоянного штрафа за
+переполнение очереди задача, пришедшая на загруженный Fog-узел,
+  1. перенаправляется соседнему Fog-узлу — наименее загруженному из
+     sibling_choices случайных (как power-of-two), если его очередь
+     ниже порога; переход добавляет sibling_hop_ms сетевой задержки;
+  2. иначе, при очереди не ниже cloud_threshold, отправляется сразу в
+     облако: обработка Fog-этапа выполняется облаком в cloud_speedup
+     раз быстрее, ожидания в очереди Fog нет;
+  3. иначе остаётся на своём узле (при полной очереди — прежний штраф).
+
+Пороги задаются долей queue_capacity узла.
+"""
+from dataclasses import dataclass
+
+# Решение по задаче (столбец offload в TaskTable)
+STAY, SIBLING, CLOUD = 0, 1, 2
+OFFLOAD_NAMES = ('на своём узле', 'соседний Fog', 'в облако')
+
+
+@dataclass(frozen=True)
+class OffloadPolicy:
+    """Пороги и стоимость разгрузки"""
+    sibling_threshold: float = 0.8  # доля queue_capacity: с неё ищется соседний Fog-узел
+    cloud_threshold: float = 1.0    # доля queue_capacity: с неё задача уходит в облако
+    sibling_choices: int = 2        # число случайных кандидатов среди соседей
+    sibling_hop_ms: float = 5       # сетевая задержка Fog → соседний Fog, мс
+    cloud_speedup: float = 2.0      # во сколько раз облако быстрее выполняет Fog-этап
+
+
+def limits(policy, queue_capacity):
+    """
+    Пороговые длины очередей узлов: (к соседу, в облако, проверка).
+
+    Решение принимается только при очереди не ниже порога проверки —
+    меньшего из двух, поэтому обычная задача стоит одного сравнения.
+    """
+    sibling_limit = [policy.sibling_threshold * capacity for capacity in queue_capacity]
+    cloud_limit = [policy.cloud_threshold * capacity for capacity in queue_capacity]
+    return sibling_limit, cloud_limit, [min(pair) for pair in zip(sibling_limit, cloud_limit)]
+
+
+def decide(policy, fog, load, offload_limits, randrange):
+    """
+    Решение по задаче на узле fog: (STAY | SIBLING | CLOUD, узел обработки).
+
+    load(node) — текущая длина очереди узла, randrange(n) — источник
+    случайных индексов. O(sibling_choices) на решение.
+    """
+    sibling_limit, cloud_limit, _ = offload_limits
+    queue = load(fog)
+    if queue >= sibling_limit[fog]:
+        sibling = choose_sibling(policy, fog, load, sibling_limit, randrange)
+        if sibling is not None:
+            return SIBLING, sibling
+    if queue >= cloud_limit[fog]:
+        return CLOUD, fog
+    return STAY, fog
+
+
+def choose_sibling(policy, fog, load, sibling_limit, randrange):
+    """Наименее загруженный из sibling_choices случайных соседей или None, если и он выше порога"""
+    n_nodes = len(sibling_limit)
+    if n_nodes < 2:
+        return None
+    best = None
+    for _ in range(policy.sibling_choices):
+        # Случайный узел, отличный от fog
+        candidate = randrange(n_nodes - 1)
+        if candidate >= fog:
+            candidate += 1
+        if best is None or load(candidate) * sibling_limit[best] < load(best) * sibling_limit[candidate]:
+            best = candidate
+    return best if load(best) < sibling_limit[best] else None
@@ -0,0 +1,219 @@
+"""
+onlinestats.py
+
+Потоковые (онлайн) оценки статистик задержек.
+
+Симуляция обновляет накопитель после каждой задачи, поэтому для длинных
+прогонов не нужно хранить все задержки:
+  • RunningMoments  — среднее и дисперсия по Уэлфорду, min/max
+  • QuantileSketch  — объединяемый квантильный эскиз (логарифмическая
+                      гистограмма с относительной погрешностью, как DDSketch)
+  • PerformanceAccumulator — потоковый аналог analyze_performance
+"""
+import math
+
+import numpy as np
+
+# Квантили, которые отчёт берёт из эскиза
+REPORT_QUANTILES = {'p50': 0.50, 'p95': 0.95, 'p99': 0.99, 'p999': 0.999}
+
+
+class RunningMoments:
+    """Среднее и дисперсия по Уэлфорду; объединение — по формуле Чана"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            other = RunningMoments()
+            other.count = len(values)
+            other.mean = float(values.mean())
+            other.m2 = float(((values - other.mean) ** 2).sum())
+            other.min = float(values.min())
+            other.max = float(values.max())
+            self.merge(other)
+
+    def merge(self, other):
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Выборочная дисперсия (как statistics.variance)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Объединяемый квантильный эскиз.
+
+    Пока значений не больше exact_limit, они хранятся как есть и квантили
+    считаются точно (тем же методом, что statistics.quantiles). Дальше
+    значения сворачиваются в логарифмические корзины: память — O(число
+    корзин), относительная погрешность квантиля не больше relative_error.
+    """
+
+    def __init__(self, relative_error=0.005, exact_limit=4096):
+        self.relative_error = relative_error
+        self.exact_limit = exact_limit
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._exact = []
+        self._buckets = {}
+        self._zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if self._exact is not None:
+            self._exact.append(value)
+            if len(self._exact) > self.exact_limit:
+                self._collapse()
+        elif value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+        else:
+            self._zeros += 1
+
+    def add_many(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        if self._exact is not None:
+            self._exact.extend(values.tolist())
+            if len(self._exact) > self.exact_limit:
+                self._collapse()
+        else:
+            self._add_buckets(values)
+
+    def merge(self, other):
+        if other._exact is not None:
+            self.add_many(other._exact)
+        else:
+            if self._exact is not None:
+                self._collapse()
+            for index, count in other._buckets.items():
+                self._buckets[index] = self._buckets.get(index, 0) + count
+            self._zeros += other._zeros
+            self.count += other.count
+        return self
+
+    def _collapse(self):
+        exact, self._exact = self._exact, None
+        self._add_buckets(np.asarray(exact, dtype=np.float64))
+
+    def _add_buckets(self, values):
+        positive = values[values > 0]
+        self._zeros += len(values) - len(positive)
+        indices, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                    return_counts=True)
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            self._buckets[index] = self._buckets.get(index, 0) + count
+
+    def quantile(self, q):
+        """Квантиль уровня q (0 < q < 1)"""
+        if not self.count:
+            raise ValueError("Эскиз пуст")
+        if self._exact is not None:
+            return float(np.percentile(self._exact, 100 * q, method='weibull'))
+
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                # Середина корзины (gamma^(i-1), gamma^i] в смысле относительной ошибки
+                return 2 * self._gamma ** index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+class PerformanceAccumulator:
+    """Потоковый аналог analyze_performance: обновляется после каждой задачи"""
+
+    def __init__(self, relative_error=0.005, exact_limit=4096):
+        self.end_to_end = RunningMoments()
+        self.sketch = QuantileSketch(relative_error, exact_limit)
+        self.edge = RunningMoments()
+        self.fog = RunningMoments()
+        self.fog_queue = RunningMoments()
+        self.cloud = RunningMoments()
+        self.network = RunningMoments()
+
+    def add(self, edge, fog_processing, fog_queue, cloud, network, end_to_end):
+        self.edge.add(edge)
+        self.fog.add(fog_processing + fog_queue)
+        self.fog_queue.add(fog_queue)
+        self.cloud.add(cloud)
+        self.network.add(network)
+        self.end_to_end.add(end_to_end)
+        self.sketch.add(end_to_end)
+
+    def add_table(self, tasks):
+        """Пакетное обновление из TaskTable"""
+        cloud = tasks['cloud_processing']
+        if 'cloud_queue_delay' in tasks:
+            cloud = cloud + tasks['cloud_queue_delay']
+        self.edge.add_many(tasks['edge_processing'])
+        self.fog.add_many(tasks['fog_processing'] + tasks['fog_queue_delay'])
+        self.fog_queue.add_many(tasks['fog_queue_delay'])
+        self.cloud.add_many(cloud)
+        self.network.add_many(tasks['edge_to_fog_network'] + tasks['fog_to_cloud_network'])
+        self.end_to_end.add_many(tasks['end_to_end_latency'])
+        self.sketch.add_many(tasks['end_to_end_latency'])
+
+    def merge(self, other):
+        for name in ('end_to_end', 'edge', 'fog', 'fog_queue', 'cloud', 'network'):
+            getattr(self, name).merge(getattr(other, name))
+        self.sketch.merge(other.sketch)
+        return self
+
+    def __len__(self):
+        return self.end_to_end.count
+
+    def stats(self):
+        """Словарь метрик в формате analyze_performance"""
+        stats = {
+            'avg_end_to_end': self.end_to_end.mean,
+            'avg_edge': self.edge.mean,
+            'avg_fog': self.fog.mean,
+            'avg_fog_queue': self.fog_queue.mean,
+            'avg_cloud': self.cloud.mean,
+            'avg_network': self.network.mean,
+            'max_latency': self.end_to_end.max,
+            'min_latency': self.end_to_end.min,
+            'std_latency': self.end_to_end.std,
+        }
+        for name, q in REPORT_QUANTILES.items():
+            stats[f'{name}_end_to_end'] = self.sketch.quantile(q)
+        return stats
@@ -0,0 +1,120 @@
+"""
+placement.py
+
+Стратегии размещения: назначение краевых устройств Fog-узлам
+(assigned_fog) и Fog-узлов облачным серверам (assigned_cloud).
+
+Каждое решение принимается за O(1) или O(log n) от числа узлов:
+  • random            — равновероятный узел, O(1)
+  • round_robin       — по кругу, O(1)
+  • least_loaded      — узел с наименьшей нагрузкой (куча), O(log n)
+  • power_of_two      — менее загруженный из двух случайных, O(1)
+  • consistent_hash   — кольцо хэшей с виртуальными узлами, O(log n)
+
+Варианты weighted_* учитывают производительность узла: вес узла —
+1 / capacity_factor (capacity_factor умножает задержку обработки, т.е.
+быстрые узлы получают пропорционально больше нагрузки). Нагрузка узла
+— сумма item_load назначенных ему элементов (для Fog → Cloud — число
+краевых устройств Fog-узла), делённая на вес.
+"""
+import hashlib
+import heapq
+import random
+
+import numpy as np
+
+# Виртуальных узлов на кольце на единицу веса (consistent_hash)
+VIRTUAL_NODES = 64
+
+BASE_STRATEGIES = ('random', 'round_robin', 'least_loaded', 'power_of_two', 'consistent_hash')
+STRATEGIES = BASE_STRATEGIES + tuple(f"weighted_{name}" for name in BASE_STRATEGIES[1:])
+
+
+def assign(strategy, n_items, weights, item_load=None, keys=None):
+    """
+    Назначение n_items элементов узлам с весами weights.
+
+    item_load — нагрузка каждого элемента (по умолчанию 1), keys — строковые
+    идентификаторы элементов для consistent_hash. Случайные стратегии
+    используют модуль random (топология воспроизводима по random.seed).
+    Возвращает массив int32 индексов узлов.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Неизвестная стратегия размещения: {strategy}. Доступны: {', '.join(STRATEGIES)}")
+    weights = np.asarray(weights, dtype=np.float64)
+    if not strategy.startswith('weighted_'):
+        weights = np.ones_like(weights)
+    base = strategy.removeprefix('weighted_')
+    item_load = [1] * n_items if item_load is None else list(item_load)
+
+    if base == 'random':
+        return np.array([random.randrange(len(weights)) for _ in range(n_items)], dtype=np.int32)
+    if base == 'round_robin':
+        return _round_robin(n_items, weights)
+    if base == 'least_loaded':
+        return _least_loaded(weights, item_load)
+    if base == 'power_of_two':
+        return _power_of_two(weights, item_load)
+    if keys is None:
+        keys = [str(i) for i in range(n_items)]
+    return _consistent_hash(weights, keys)
+
+
+def _round_robin(n_items, weights):
+    """Взвешенный круговой обход (stride scheduling): при равных весах — i % n"""
+    if np.all(weights == weights[0]):
+        return (np.arange(n_items) % len(weights)).astype(np.int32)
+    stride = 1.0 / weights
+    heap = [(0.0, node) for node in range(len(weights))]
+    assignment = np.empty(n_items, dtype=np.int32)
+    for i in range(n_items):
+        passed, node = heap[0]
+        assignment[i] = node
+        heapq.heapreplace(heap, (passed + stride[node], node))
+    return assignment
+
+
+def _least_loaded(weights, item_load):
+    heap = [(0.0, node) for node in range(len(weights))]
+    load = np.zeros(len(weights))
+    assignment = np.empty(len(item_load), dtype=np.int32)
+    for i, cost in enumerate(item_load):
+        _, node = heap[0]
+        assignment[i] = node
+        load[node] += cost
+        heapq.heapreplace(heap, (load[node] / weights[node], node))
+    return assignment
+
+
+def _power_of_two(weights, item_load):
+    n = len(weights)
+    load = [0.0] * n
+    inverse = (1.0 / weights).tolist()
+    assignment = np.empty(len(item_load), dtype=np.int32)
+    for i, cost in enumerate(item_load):
+        a, b = random.randrange(n), random.randrange(n)
+        node = a if load[a] * inverse[a] <= load[b] * inverse[b] else b
+        assignment[i] = node
+        load[node] += cost
+    return assignment
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _consistent_hash(weights, keys):
+    # Число виртуальных узлов пропорционально весу (не меньше одного)
+    replicas = np.maximum(1, np.rint(VIRTUAL_NODES * weights / weights.max())).astype(int)
+    points, owners = [], []
+    for node, count in enumerate(replicas.tolist()):
+        for replica in range(count):
+            points.append(_hash(f"node-{node}#{replica}"))
+            owners.append(node)
+    order = np.argsort(np.array(points, dtype=np.uint64), kind='stable')
+    ring = np.array(points, dtype=np.uint64)[order]
+    owners = np.array(owners, dtype=np.int32)[order]
+    # Двоичный поиск первой точки кольца не меньше хэша ключа (по часовой стрелке)
+    hashes = np.array([_hash(key) for key in keys], dtype=np.uint64)
+    position = np.searchsorted(ring, hashes) % len(ring)
+    return owners[position]
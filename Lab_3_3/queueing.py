@@ -0,0 +1,263 @@
+"""
+queueing.py
+
+Аналитическая оценка установившегося режима — без симуляции.
+
+Модель совпадает с событийным движком (eventsim): задачи приходят
+пуассоновским потоком со средним интервалом mean_interarrival_ms (по
+умолчанию — из модели потока scenario.arrivals; для MMPP и суточного
+профиля берётся средняя интенсивность), краевое устройство выбирается
+равновероятно, Fog-узел — один обработчик, облачный сервер —
+cloud_concurrency обработчиков:
+  • Fog-узел — M/G/1: интенсивность λ_i = (доля устройств узла) / интервал,
+    среднее ожидание — формула Поллачека — Хинчина;
+  • облачный сервер — G/G/c: вероятность ожидания — формула Эрланга C,
+    среднее ожидание M/M/c с поправкой Кингмана (Аллена — Каннина)
+    (c_a² + c_s²) / 2; вариация потока из Fog-узлов — по уравнению
+    связи Уитта c_d² = ρ² c_s² + (1 − ρ²) c_a²;
+  • хвост ожидания — атом в нуле и экспонента:
+    P(W > t) = P_wait · exp(−t · P_wait / W);
+  • сквозная задержка на пути через Fog-узел — нормальная часть без
+    ожидания плюс ожидание (экспоненциально-модифицированное нормальное
+    распределение), по всем путям — смесь с весами долей потока.
+
+Очереди считаются неограниченными, повторы при переполнении и политика
+разгрузки не учитываются; при ρ >= 1 ожидание бесконечно. Оценка
+конфигурации занимает доли миллисекунды, поэтому перебор тысяч
+вариантов не требует прогонов симулятора.
+"""
+import math
+
+import numpy as np
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def uniform_moments(low, high):
+    """Среднее и дисперсия равномерного распределения на целых low..high"""
+    low, high = np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64)
+    return (low + high) / 2, ((high - low + 1) ** 2 - 1) / 12
+
+
+def erlang_c(servers, offered_load):
+    """
+    Вероятность ожидания в M/M/c (формула Эрланга C).
+
+    offered_load = λ · E[S]; считается через устойчивую рекурсию
+    Эрланга B. При offered_load >= servers возвращает 1.
+    """
+    servers = np.asarray(servers, dtype=np.int64)
+    offered_load = np.asarray(offered_load, dtype=np.float64)
+    blocking = np.ones(np.broadcast(servers, offered_load).shape)
+    for k in range(1, int(servers.max(initial=1)) + 1):
+        step = offered_load * blocking / (k + offered_load * blocking)
+        blocking = np.where(k <= servers, step, blocking)
+    rho = offered_load / servers
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wait = blocking / (1 - rho * (1 - blocking))
+    return np.where(rho < 1, wait, 1.0)
+
+
+def ggc_wait(arrival_rate, mean_service, servers=1, arrival_scv=1.0, service_scv=1.0):
+    """
+    Вероятность ожидания и среднее ожидание в G/G/c (Эрланг C + Кингман).
+
+    scv — квадрат коэффициента вариации. При c = 1 и пуассоновском
+    потоке совпадает с формулой Поллачека — Хинчина для M/G/1.
+    """
+    arrival_rate = np.asarray(arrival_rate, dtype=np.float64)
+    offered_load = arrival_rate * mean_service
+    prob_wait = erlang_c(servers, offered_load)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mmc_wait = prob_wait * mean_service / (servers - offered_load)
+    mean_wait = np.where(offered_load < servers,
+                         mmc_wait * (arrival_scv + service_scv) / 2, np.inf)
+    return np.where(arrival_rate > 0, prob_wait, 0.0), np.where(arrival_rate > 0, mean_wait, 0.0)
+
+
+def wait_quantile(p, prob_wait, mean_wait):
+    """Квантиль ожидания уровня p (атом в нуле + экспонента)"""
+    prob_wait = np.asarray(prob_wait, dtype=np.float64)
+    mean_wait = np.asarray(mean_wait, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quantile = mean_wait / prob_wait * np.log(prob_wait / (1 - p))
+    return np.where(prob_wait > 1 - p, quantile, 0.0)
+
+
+def departure_scv(utilization, arrival_scv, service_scv):
+    """Вариация выходящего потока одноканального узла (уравнение связи Уитта)"""
+    utilization = np.minimum(utilization, 1.0)
+    return utilization ** 2 * service_scv + (1 - utilization ** 2) * arrival_scv
+
+
+def _normal_sf(z):
+    return 0.5 * _erfc(z / math.sqrt(2)).astype(np.float64)
+
+
+def _sojourn_sf(t, mean, std, prob_wait, wait_scale):
+    """
+    P(N + W > t): N ~ Normal(mean, std²), W — атом в нуле и экспонента
+    со средним wait_scale при ожидании (вероятность prob_wait).
+    """
+    z = (t - mean) / std
+    shifted = z - std / wait_scale
+    # exp(-(t - mean)/θ + σ²/2θ²) · Φ(shifted); при малом θ — асимптотика Миллса
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        exact = np.exp(-(t - mean) / wait_scale + std ** 2 / (2 * wait_scale ** 2)) * _normal_sf(-shifted)
+        mills = np.exp(-z ** 2 / 2) / (-shifted * math.sqrt(2 * math.pi))
+    tail = np.where(shifted > -30, exact, mills)
+    return _normal_sf(z) + prob_wait * np.where(np.isfinite(tail), tail, 0.0)
+
+
+def _mixture_quantile(p, weights, mean, std, prob_wait, wait_scale, points=32, rounds=3):
+    """
+    Квантиль смеси путей: rounds раз сужаемая сетка из points значений t
+    (все точки сетки — одним векторным вычислением). Одинаковые пути
+    объединяются.
+    """
+    paths, inverse = np.unique(np.column_stack([mean, std, prob_wait, wait_scale]), axis=0, return_inverse=True)
+    weights = np.bincount(inverse.ravel(), weights=weights)
+    mean, std, prob_wait, wait_scale = paths.T
+    low = float(np.min(mean - 10 * std))
+    high = float(np.max(mean + 10 * std + wait_scale * (math.log(1 / (1 - p)) + 10)))
+    for _ in range(rounds):
+        grid = np.linspace(low, high, points)
+        tail = _sojourn_sf(grid[:, None], mean, std, prob_wait, wait_scale) @ weights
+        above = int(np.count_nonzero(tail > 1 - p))  # хвост убывает по t
+        low, high = grid[max(above - 1, 0)], grid[min(above, points - 1)]
+    return float((low + high) / 2)
+
+
+def estimate(fog_weight, fog_low, fog_high, fog_cloud, cloud_low, cloud_high, cloud_servers,
+             edge_mean, edge_var, fog_to_cloud_range, mean_interarrival_ms=10.0, quantile=0.95):
+    """
+    Оценка по массивам топологии.
+
+    fog_weight — доля потока задач через каждый Fog-узел, fog_low/high —
+    диапазоны обработки, fog_cloud — назначенный облачный сервер;
+    edge_mean/edge_var — среднее и дисперсия задержки краевого уровня
+    (обработка + сеть) задач каждого узла. Возвращает словарь
+    {'fog': {...}, 'cloud': {...}, 'stats': {...}} — массивы по узлам и
+    сводные метрики в формате analyze_performance.
+    """
+    fog_weight = np.asarray(fog_weight, dtype=np.float64)
+    fog_cloud = np.asarray(fog_cloud, dtype=np.int64)
+    n_cloud = len(cloud_low)
+
+    # Fog-узлы: M/G/1
+    fog_mean, fog_var = uniform_moments(fog_low, fog_high)
+    fog_scv = fog_var / fog_mean ** 2
+    fog_rate = fog_weight / mean_interarrival_ms
+    fog_utilization = fog_rate * fog_mean
+    fog_prob_wait, fog_wait = ggc_wait(fog_rate, fog_mean, 1, 1.0, fog_scv)
+
+    # Облачные серверы: G/G/c, поток — сумма выходов назначенных Fog-узлов
+    cloud_mean, cloud_var = uniform_moments(cloud_low, cloud_high)
+    cloud_servers = np.asarray(cloud_servers, dtype=np.int64)
+    cloud_rate = np.bincount(fog_cloud, weights=fog_rate, minlength=n_cloud)
+    flow_scv = np.bincount(fog_cloud, weights=fog_rate * departure_scv(fog_utilization, 1.0, fog_scv),
+                           minlength=n_cloud)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cloud_arrival_scv = np.where(cloud_rate > 0, flow_scv / cloud_rate, 1.0)
+    cloud_utilization = cloud_rate * cloud_mean / cloud_servers
+    cloud_prob_wait, cloud_wait = ggc_wait(cloud_rate, cloud_mean, cloud_servers,
+                                           cloud_arrival_scv, cloud_var / cloud_mean ** 2)
+
+    # Сквозная задержка по путям Edge → Fog i → Cloud
+    network_mean, network_var = uniform_moments(*fog_to_cloud_range)
+    used = fog_weight > 0
+    path_mean = edge_mean + fog_mean + network_mean + cloud_mean[fog_cloud]
+    path_std = np.sqrt(edge_var + fog_var + network_var + cloud_var[fog_cloud])
+    path_wait = fog_wait + cloud_wait[fog_cloud]
+    path_prob_wait = 1 - (1 - fog_prob_wait) * (1 - cloud_prob_wait[fog_cloud])
+    weight = fog_weight / fog_weight.sum()
+    stable = bool(np.all(np.isfinite(path_wait[used])))
+
+    if stable:
+        wait_scale = np.where(path_prob_wait > 0, path_wait / np.maximum(path_prob_wait, 1e-300), 1e-9)
+        wait_scale = np.maximum(wait_scale, 1e-9)
+        avg_end_to_end = float(np.dot(weight, path_mean + path_wait))
+        p_end_to_end = _mixture_quantile(quantile, weight[used], path_mean[used], np.maximum(path_std[used], 1e-9),
+                                         path_prob_wait[used], wait_scale[used])
+        avg_fog_queue = float(np.dot(weight, fog_wait))
+        avg_cloud_queue = float(np.dot(weight, cloud_wait[fog_cloud]))
+    else:
+        avg_end_to_end = p_end_to_end = avg_fog_queue = avg_cloud_queue = math.inf
+
+    return {
+        'fog': {
+            'arrival_rate': fog_rate,
+            'utilization': fog_utilization,
+            'prob_wait': fog_prob_wait,
+            'mean_wait': fog_wait,
+            'p_wait': wait_quantile(quantile, fog_prob_wait, fog_wait),
+        },
+        'cloud': {
+            'arrival_rate': cloud_rate,
+            'utilization': cloud_utilization,
+            'prob_wait': cloud_prob_wait,
+            'mean_wait': cloud_wait,
+            'p_wait': wait_quantile(quantile, cloud_prob_wait, cloud_wait),
+        },
+        'stats': {
+            'stable': stable,
+            'quantile': quantile,
+            'avg_end_to_end': avg_end_to_end,
+            'p_end_to_end': p_end_to_end,
+            'avg_fog_queue': avg_fog_queue,
+            'avg_cloud_queue': avg_cloud_queue,
+            'max_fog_utilization': float(fog_utilization.max(initial=0.0)),
+            'max_cloud_utilization': float(cloud_utilization.max(initial=0.0)),
+        },
+    }
+
+
+def interarrival_ms(scenario, mean_interarrival_ms=None):
+    """
+    Средний интервал между задачами: заданный явно, по модели потока
+    scenario.arrivals или 10 мс — как по умолчанию у simulate_event_driven.
+    """
+    if mean_interarrival_ms is not None:
+        return mean_interarrival_ms
+    if scenario.arrivals is not None:
+        return 1000.0 / scenario.arrivals.mean_rate_s(scenario.edge_devices)
+    return 10.0
+
+
+def analyze_topology(simulator, mean_interarrival_ms=None, quantile=0.95):
+    """Оценка для построенной топологии DistributedSystemSimulator (с её размещением)"""
+    edges, fogs, clouds = simulator.edge_devices, simulator.fog_nodes, simulator.cloud_servers
+    mean_interarrival_ms = interarrival_ms(simulator.scenario, mean_interarrival_ms)
+    n_fog = len(fogs)
+    edge_delay = (edges.processing_delay + edges.network_delay).astype(np.float64)
+    edge_count = np.bincount(edges.assigned_fog, minlength=n_fog).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        edge_mean = np.nan_to_num(np.bincount(edges.assigned_fog, weights=edge_delay, minlength=n_fog) / edge_count)
+        edge_var = np.nan_to_num(np.bincount(edges.assigned_fog, weights=edge_delay ** 2, minlength=n_fog)
+                                 / edge_count) - edge_mean ** 2
+    return estimate(edge_count / len(edges), fogs.processing_low, fogs.processing_high, fogs.assigned_cloud,
+                    clouds.processing_low, clouds.processing_high, clouds.concurrency,
+                    edge_mean, np.maximum(edge_var, 0.0), simulator.scenario.fog_to_cloud_range,
+                    mean_interarrival_ms, quantile)
+
+
+def analyze_scenario(scenario, mean_interarrival_ms=None, quantile=0.95):
+    """
+    Оценка сценария без построения топологии: поток поровну между
+    Fog-узлами, Fog-узлы — по кругу между облачными серверами,
+    производительность каждого узла — середина fog_capacity_spread.
+    """
+    n_fog, n_cloud = scenario.fog_nodes, scenario.cloud_servers
+    factor = sum(scenario.fog_capacity_spread) / 2
+    low, high = scenario.fog_delay_range
+    # Краевые устройства: поровну стационарные и мобильные, обработка и сеть независимы
+    moments = [uniform_moments(*scenario.stationary_delay_range), uniform_moments(*scenario.mobile_delay_range)]
+    edge_mean = sum(2 * float(mean) for mean, _ in moments) / 2
+    edge_var = sum(2 * float(var) + (2 * float(mean) - edge_mean) ** 2 for mean, var in moments) / 2
+    cloud_low, cloud_high = scenario.cloud_delay_range
+    mean_interarrival_ms = interarrival_ms(scenario, mean_interarrival_ms)
+    return estimate(np.full(n_fog, 1.0 / n_fog), np.full(n_fog, int(low * factor)),
+                    np.full(n_fog, int(high * factor)), np.arange(n_fog) % n_cloud,
+                    np.full(n_cloud, cloud_low), np.full(n_cloud, cloud_high),
+                    np.full(n_cloud, scenario.cloud_concurrency), np.full(n_fog, edge_mean),
+                    np.full(n_fog, edge_var), scenario.fog_to_cloud_range, mean_interarrival_ms, quantile)
@@ -0,0 +1,108 @@
+"""
+resultcache.py
+
+Кэш результатов симуляции конфигураций.
+
+Прогон полностью определяется сценарием, движком, топологией, seed и
+числом задач, поэтому результат можно переиспользовать: ключ — SHA-256
+канонического JSON этих параметров. В памяти хранится LRU на maxsize
+записей; при заданном directory записи дополнительно сохраняются на
+диск (stats — JSON, таблица задач — .npz) и переживают перезапуск.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict
+
+import numpy as np
+
+from tasktable import TaskTable
+
+
+def cache_key(scenario, engine, config, seed, n_tasks):
+    """Канонический хэш параметров прогона"""
+    payload = {
+        'scenario': asdict(scenario),
+        'engine': engine,
+        'topology': [config['edge_devices'], config['fog_nodes'], config['cloud_servers']],
+        'seed': seed,
+        'n_tasks': n_tasks,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """LRU-кэш (stats, tasks) с необязательным хранилищем на диске"""
+
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """(stats, tasks) или None; tasks может быть None, если сохранялась только статистика"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        elif self.directory is not None:
+            entry = self._load(key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key, stats, tasks=None):
+        # Уже сохранённую таблицу задач не затираем записью только со статистикой
+        previous = self._entries.get(key)
+        if tasks is None and previous is not None:
+            tasks = previous[1]
+        self._remember(key, (stats, tasks))
+        if self.directory is not None:
+            self._store(key, stats, tasks)
+
+    def __contains__(self, key):
+        return key in self._entries or (
+            self.directory is not None and os.path.exists(self._path(key, 'json')))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Очистить кэш в памяти (файлы на диске остаются)"""
+        self._entries.clear()
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key, extension):
+        return os.path.join(self.directory, f"{key}.{extension}")
+
+    def _store(self, key, stats, tasks):
+        os.makedirs(self.directory, exist_ok=True)
+        if tasks is not None:
+            np.savez(self._path(key, 'npz'), **{name: tasks[name] for name in tasks.columns})
+        # JSON пишется последним: его наличие означает, что запись полная
+        with open(self._path(key, 'json'), 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False, default=float)
+
+    def _load(self, key):
+        try:
+            with open(self._path(key, 'json'), encoding='utf-8') as f:
+                stats = json.load(f)
+        except FileNotFoundError:
+            return None
+        tasks = None
+        if os.path.exists(self._path(key, 'npz')):
+            with np.load(self._path(key, 'npz')) as columns:
+                tasks = TaskTable({name: columns[name] for name in columns.files})
+        return stats, tasks
@@ -0,0 +1,134 @@
+"""
+runstore.py
+
+Хранилище результатов прогонов на диске.
+
+Каждый прогон — отдельный каталог <directory>/<name>/:
+  • meta.json   — конфигурация, итоговая статистика и сводные таблицы
+                  (например, результаты анализа чувствительности)
+  • tasks.arrow — таблица задач в формате Arrow IPC (если установлен
+                  pyarrow; конфигурация дублируется в метаданных схемы)
+    или <столбец>.npy — по файлу NumPy на столбец (без pyarrow)
+
+Оба формата столбцовые и без сжатия, поэтому load() отображает файлы
+в память (mmap) и не копирует данные: отчёты и графики строятся по
+сохранённым результатам без повторной симуляции.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+
+from tasktable import TaskTable
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow — необязательная зависимость
+    pa = None
+
+META_FILE = 'meta.json'
+ARROW_FILE = 'tasks.arrow'
+
+
+class StoredRun:
+    """Загруженный прогон: конфигурация, статистика, таблицы и задачи"""
+
+    def __init__(self, name, config, stats, tables, tasks):
+        self.name = name
+        self.config = config
+        self.stats = stats
+        self.tables = tables
+        self.tasks = tasks
+
+
+class RunStore:
+    """Каталог сохранённых прогонов (backend: 'arrow', 'npy' или None — автоматически)"""
+
+    def __init__(self, directory='runs', backend=None):
+        if backend is None:
+            backend = 'arrow' if pa is not None else 'npy'
+        if backend == 'arrow' and pa is None:
+            raise ImportError("Для формата Arrow нужен пакет pyarrow")
+        if backend not in ('arrow', 'npy'):
+            raise ValueError(f"Неизвестный формат хранилища: {backend}")
+        self.directory = directory
+        self.backend = backend
+
+    def _path(self, name, *parts):
+        return os.path.join(self.directory, name, *parts)
+
+    def __contains__(self, name):
+        return os.path.exists(self._path(name, META_FILE))
+
+    def names(self):
+        """Имена сохранённых прогонов"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if name in self)
+
+    def save(self, name, tasks=None, stats=None, config=None, tables=None):
+        """
+        Сохранить прогон под именем name (существующий перезаписывается).
+
+        tables — словарь сводных таблиц {имя: список записей-словарей}.
+        """
+        run_dir = self._path(name)
+        if os.path.exists(run_dir):
+            shutil.rmtree(run_dir)
+        os.makedirs(run_dir)
+
+        meta = {
+            'config': config or {},
+            'stats': stats or {},
+            'tables': tables or {},
+            'backend': self.backend if tasks is not None else None,
+            'columns': list(tasks.columns) if tasks is not None else [],
+        }
+        if tasks is not None:
+            if self.backend == 'arrow':
+                self._write_arrow(run_dir, tasks, meta['config'])
+            else:
+                for column in tasks.columns:
+                    np.save(os.path.join(run_dir, f"{column}.npy"), tasks[column])
+        # meta.json пишется последним: его наличие означает, что прогон записан полностью
+        with open(os.path.join(run_dir, META_FILE), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1, default=float)
+        return run_dir
+
+    def load(self, name, mmap=True):
+        """Загрузить прогон; при mmap=True столбцы задач отображаются в память"""
+        if name not in self:
+            raise KeyError(f"Прогон {name!r} не найден в {self.directory}")
+        with open(self._path(name, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        tasks = None
+        if meta['backend'] == 'arrow':
+            tasks = self._read_arrow(self._path(name, ARROW_FILE), mmap)
+        elif meta['backend'] == 'npy':
+            tasks = TaskTable({
+                column: np.load(self._path(name, f"{column}.npy"), mmap_mode='r' if mmap else None)
+                for column in meta['columns']
+            })
+        return StoredRun(name, meta['config'], meta['stats'], meta['tables'], tasks)
+
+    @staticmethod
+    def _write_arrow(run_dir, tasks, config):
+        table = pa.table({column: tasks[column] for column in tasks.columns},
+                         metadata={b'config': json.dumps(config, ensure_ascii=False).encode('utf-8')})
+        with pa.OSFile(os.path.join(run_dir, ARROW_FILE), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @staticmethod
+    def _read_arrow(path, mmap):
+        source = pa.memory_map(path, 'r') if mmap else pa.OSFile(path, 'rb')
+        table = pa.ipc.open_file(source).read_all()
+        columns = {}
+        for column in table.column_names:
+            chunks = table.column(column).chunks
+            array = chunks[0] if len(chunks) == 1 else table.column(column).combine_chunks()
+            # Один блок без пропусков — to_numpy возвращает представление без копирования
+            columns[column] = array.to_numpy(zero_copy_only=mmap)
+        return TaskTable(columns)
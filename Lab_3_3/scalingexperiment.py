@@ -3,136 +3,268 @@
 Конфигурация: Edge=100, Fog=20, Cloud=3
 Анализ чувствительности системы
 """
-import random
-import statistics
+import os
+import sys
+import time
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from collections import defaultdict
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from arrivals import PoissonArrivals
+from montecarlo import run_replications
+from onlinestats import PerformanceAccumulator
+# Общий модуль графиков plotting.py лежит в корне репозитория
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from plotting import finish_figure, get_figure
+from resultcache import ResultCache, cache_key
+from runstore import RunStore
+from placement import STRATEGIES
+from queueing import analyze_scenario, analyze_topology
+from simkernel import SENSITIVITY_SCENARIO, run_scenario
+from timeline import windowed_metrics
 
 class SensitivityAnalyzer:
-    def __init__(self, base_edge=100, base_fog=20, base_cloud=3):
+    def __init__(self, base_edge=100, base_fog=20, base_cloud=3, max_workers=None,
+                 scenario=SENSITIVITY_SCENARIO, engine='loop', cache_size=128, cache_dir=None):
         self.base_config = {
             'edge_devices': base_edge,
             'fog_nodes': base_fog,
             'cloud_servers': base_cloud
         }
+        # Параметры модели и движок симуляции (см. simkernel)
+        self.scenario = scenario
+        self.engine = engine
+        # Число процессов для параллельных прогонов (None — по числу ядер)
+        self.max_workers = max_workers
+        # Кэш результатов по (сценарий, движок, конфигурация, seed, число задач);
+        # cache_dir — необязательное хранилище на диске
+        self.cache = ResultCache(cache_size, cache_dir)
+
+    def __getstate__(self):
+        # В рабочие процессы пула кэш не передаётся
+        state = self.__dict__.copy()
+        state['cache'] = None
+        return state
         
-    def simulate_configuration(self, config, seed=42, n_tasks=200):
-        """Симуляция одной конфигурации системы"""
-        random.seed(seed)
-        
-        # Инициализация устройств
-        edge_devices = []
-        for i in range(config['edge_devices']):
-            device_type = "стационарный" if i % 2 == 0 else "мобильный"
-            if device_type == "мобильный":
-                processing_range = (8, 20)
-                network_range = (8, 20)
+    def simulate_sweep(self, configs, seed=42, common_seed=False):
+        """
+        Параллельная симуляция набора независимых конфигураций.
+
+        Конфигурации распределяются по пулу процессов, результаты (stats)
+        возвращаются в порядке configs. Каждая конфигурация получает свой
+        детерминированный seed, порождённый из seed через SeedSequence, —
+        результат не зависит от числа процессов и порядка выполнения.
+        common_seed=True — все конфигурации считаются с одним seed (общие
+        случайные числа — сравнение вариаций без лишнего шума).
+        """
+        if common_seed:
+            seeds = [seed] * len(configs)
+        else:
+            seeds = [int(child.generate_state(1)[0])
+                     for child in np.random.SeedSequence(seed).spawn(len(configs))]
+        jobs = [(config, job_seed, config.get('tasks', 200))
+                for config, job_seed in zip(configs, seeds)]
+        keys = [self._cache_key(*job) for job in jobs]
+
+        results = {}
+        pending = {}
+        for key, job in zip(keys, jobs):
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[key] = cached[0]
             else:
-                processing_range = (5, 15)
-                network_range = (5, 15)
-                
-            edge_devices.append({
-                'id': f"Edge_{i}",
-                'type': device_type,
-                'processing_delay': random.randint(*processing_range),
-                'network_delay': random.randint(*network_range),
-                'assigned_fog': random.randint(0, config['fog_nodes']-1)
-            })
-        
-        # Fog-узлы - много узлов на малое количество Edge
-        fog_nodes = []
-        for i in range(config['fog_nodes']):
-            # Для конфигурации "много Fog на мало Edge" узлы менее загружены
-            capacity_factor = random.uniform(0.9, 1.1)  # Более стабильная производительность
-            queue_capacity = 30  # Меньшая очередь, так как меньше нагрузка
-            
-            fog_nodes.append({
-                'id': f"Fog_{i}",
-                'processing_delay_range': (int(25 * capacity_factor), int(70 * capacity_factor)),
-                'queue_capacity': queue_capacity,
-                'current_queue': 0,
-                'assigned_cloud': random.randint(0, config['cloud_servers']-1),
-                'processed_tasks': 0,
-                'queue_overflows': 0
-            })
-        
-        # Облачные серверы
-        cloud_servers = []
-        for i in range(config['cloud_servers']):
-            cloud_servers.append({
-                'id': f"Cloud_{i}",
-                'processing_delay_range': (10, 30),
-                'processed_tasks': 0
-            })
-        
-        # Симуляция задач
-        tasks = []
-        fog_queue_delays = []
+                pending.setdefault(key, job)
+
+        if self.max_workers == 1 or len(pending) < 2:
+            computed = [self._simulate_job(job) for job in pending.values()]
+        else:
+            max_workers = min(self.max_workers or os.cpu_count() or 1, len(pending))
+            chunksize = max(1, len(pending) // (4 * max_workers))
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                computed = list(pool.map(self._simulate_job, pending.values(), chunksize=chunksize))
+        for key, stats in zip(pending, computed):
+            self.cache.put(key, stats)
+            results[key] = stats
+        return [results[key] for key in keys]
+
+    def simulate_replicated(self, config, seed=42, target_half_width=0.01,
+                            metrics=('avg_latency', 'p95_latency'), **options):
+        """
+        Монте-Карло для одной конфигурации: независимые повторения до тех
+        пор, пока доверительный интервал metrics не станет уже
+        target_half_width (доля от среднего). Параметры — см.
+        montecarlo.run_replications. Возвращает (summary, samples).
+        """
+        options.setdefault('max_workers', self.max_workers)
+        job = partial(self._replicate, config, config.get('tasks', 200))
+        return run_replications(job, seed, target_half_width, metrics=metrics, **options)
+
+    def _replicate(self, config, n_tasks, seed):
+        return self._simulate_job((config, seed, n_tasks))
+
+    def _cache_key(self, config, seed, n_tasks):
+        return cache_key(self._scenario(config), self.engine, config, seed, n_tasks)
+
+    def _scenario(self, config):
+        """
+        Сценарий конфигурации: топология, необязательный множитель интенсивности
+        потока load_factor и очередь облака cloud_drain_probability
+        """
+        scenario = self.scenario.with_topology(
+            config['edge_devices'], config['fog_nodes'], config['cloud_servers'])
+        if config.get('cloud_drain_probability') is not None:
+            scenario = replace(scenario, cloud_drain_probability=config['cloud_drain_probability'])
+        if config.get('load_factor', 1.0) != 1.0:
+            scenario = replace(scenario, arrivals=scenario.arrivals.scaled(config['load_factor']))
+        return scenario
+
+    def _simulate_job(self, job):
+        """Один прогон в рабочем процессе; наружу передаётся только stats"""
+        config, seed, n_tasks = job
+        stats, _ = self._simulate(config, seed, n_tasks)
+        return stats
         
-        for task_id in range(n_tasks):
-            edge_device = random.choice(edge_devices)
-            fog_node = fog_nodes[edge_device['assigned_fog']]
-            cloud_server = cloud_servers[fog_node['assigned_cloud']]
-            
-            # Задержки
-            edge_processing = edge_device['processing_delay']
-            edge_to_fog_network = edge_device['network_delay']
-            
-            fog_processing = random.randint(*fog_node['processing_delay_range'])
-            
-            # Задержка очереди - для конфигурации "много Fog на мало Edge" должна быть низкой
-            fog_queue_delay = fog_node['current_queue'] * 1  # Меньший множитель
-            
-            fog_to_cloud_network = random.randint(20, 50)
-            cloud_processing = random.randint(*cloud_server['processing_delay_range'])
-            
-            # Обновление очереди
-            if fog_node['current_queue'] < fog_node['queue_capacity']:
-                fog_node['current_queue'] += 1
-            else:
-                fog_node['queue_overflows'] += 1
-                fog_queue_delay += 10
-            
-            # Общая задержка
-            end_to_end_latency = (edge_processing + edge_to_fog_network + 
-                                 fog_processing + fog_queue_delay + 
-                                 fog_to_cloud_network + cloud_processing)
-            
-            tasks.append({
-                'task_id': task_id,
-                'end_to_end_latency': end_to_end_latency,
-                'fog_queue_delay': fog_queue_delay,
-                'edge_processing': edge_processing,
-                'fog_processing': fog_processing,
-                'cloud_processing': cloud_processing
-            })
-            
-            fog_queue_delays.append(fog_queue_delay)
-            
-            # Обработка задач из очереди - высокая вероятность для малонагруженных Fog
-            if random.random() < 0.5:  # 50% chance - высокая
-                if fog_node['current_queue'] > 0:
-                    fog_node['current_queue'] -= 1
-                    fog_node['processed_tasks'] += 1
+    def simulate_configuration(self, config, seed=42, n_tasks=200):
+        """Симуляция одной конфигурации системы (с кэшированием результата)"""
+        key = self._cache_key(config, seed, n_tasks)
+        cached = self.cache.get(key)
+        if cached is not None and cached[1] is not None:
+            return cached
+        stats, tasks = self._simulate(config, seed, n_tasks)
+        self.cache.put(key, stats, tasks)
+        return stats, tasks
+
+    def _simulate(self, config, seed, n_tasks):
+        scenario = self._scenario(config)
+        accumulator = PerformanceAccumulator()
+        _, tasks = run_scenario(scenario, n_tasks, seed, engine=self.engine, accumulator=accumulator)
         
         # Анализ результатов
-        latencies = [t['end_to_end_latency'] for t in tasks]
+        latency = accumulator.end_to_end
         
         stats = {
-            'avg_latency': statistics.mean(latencies),
-            'p95_latency': statistics.quantiles(latencies, n=20)[18] if len(latencies) >= 20 else statistics.quantiles(latencies, n=len(latencies))[-1],
-            'max_latency': max(latencies),
-            'avg_fog_queue_delay': statistics.mean(fog_queue_delays),
-            'min_latency': min(latencies),
-            'std_latency': statistics.stdev(latencies) if len(latencies) > 1 else 0,
+            'avg_latency': latency.mean,
+            'p95_latency': accumulator.sketch.quantile(0.95 if n_tasks >= 20 else 1 - 1 / n_tasks),
+            'p99_latency': accumulator.sketch.quantile(0.99 if n_tasks >= 100 else 1 - 1 / n_tasks),
+            'max_latency': latency.max,
+            'avg_fog_queue_delay': accumulator.fog_queue.mean,
+            'min_latency': latency.min,
+            'std_latency': latency.std,
             'edge_per_fog': config['edge_devices'] / config['fog_nodes'],
             'fog_per_cloud': config['fog_nodes'] / config['cloud_servers']
         }
         
         return stats, tasks
 
+    def find_capacity(self, slo_ms, metric='p95_latency', parameter='edge_devices', config=None,
+                      n_tasks=10000, seed=42, tolerance=0.02, max_probes=12):
+        """
+        Наибольшая нагрузка, при которой metric ('p95_latency' или
+        'p99_latency') не превышает slo_ms.
+
+        parameter — 'edge_devices' (число устройств при тех же Fog и Cloud)
+        или 'load_factor' (множитель интенсивности потока scenario.arrivals).
+        Нагрузку задаёт поток во времени, поэтому нужны движок 'event' и
+        scenario.arrivals. Начальная вилка берётся из аналитической модели
+        (queueing) — прогоны начинаются рядом с ответом; затем бисекция по
+        прогонам simulate_sweep (общий seed, кэш) до относительной точности
+        tolerance, не более max_probes прогонов. Возвращает словарь:
+        capacity — наибольшее значение, выдержавшее SLO в прогоне (None, если
+        ни один прогон SLO не выдержал), violation — наименьшее нарушившее
+        (None, если нарушения не найдено), analytic — аналитическая оценка,
+        probes — список (значение, metric).
+        """
+        if self.engine != 'event' or self.scenario.arrivals is None:
+            raise ValueError("Нагрузку задаёт поток во времени: нужны engine='event' и scenario.arrivals")
+        quantile = {'p95_latency': 0.95, 'p99_latency': 0.99}[metric]
+        base = dict(config or self.base_config, tasks=n_tasks)
+        integer = parameter == 'edge_devices'
+
+        def at(value):
+            return dict(base, **{parameter: max(1, round(value)) if integer else value})
+
+        # Аналитическая оценка: квантиль растёт с нагрузкой — бисекция без прогонов
+        def analytic_meets(value):
+            return analyze_scenario(self._scenario(at(value)), quantile=quantile)['stats']['p_end_to_end'] <= slo_ms
+        low, high = 0.0, base.get(parameter, 1.0)
+        while analytic_meets(high) and high < 1e9:
+            low, high = high, high * 2
+        for _ in range(50):
+            middle = (low + high) / 2
+            low, high = (middle, high) if analytic_meets(middle) else (low, middle)
+        analytic = at(low)[parameter]
+
+        probes = []
+
+        def meets(value):
+            probe = at(value)
+            stats = self.simulate_sweep([probe], seed, common_seed=True)[0]
+            probes.append((probe[parameter], stats[metric]))
+            return stats[metric] <= slo_ms
+
+        def midpoint(low, high):
+            return (low + high) // 2 if integer else (low + high) / 2
+
+        def resolved(low, high):
+            return high - low <= 1 if integer else high - low <= tolerance * high
+
+        def budget():
+            return len(probes) < max_probes
+
+        # Вилка вокруг аналитической оценки; при промахе — расширение вдвое.
+        # capacity и violation — только значения, проверенные прогоном
+        capacity = violation = None
+        low, high = analytic / 1.25, analytic * 1.25
+        if integer:
+            low, high = max(1, int(low)), int(high) + 1
+        while budget() and low:
+            if meets(low):
+                capacity = low
+                break
+            violation, low = low, midpoint(0, low)
+        while budget() and capacity is not None and violation is None:
+            if meets(high):
+                capacity, high = high, high * 2
+            else:
+                violation = high
+        while budget() and capacity is not None and violation is not None and not resolved(capacity, violation):
+            middle = midpoint(capacity, violation)
+            if meets(middle):
+                capacity = middle
+            else:
+                violation = middle
+
+        return {
+            'parameter': parameter,
+            'metric': metric,
+            'slo_ms': slo_ms,
+            'capacity': capacity,
+            'violation': violation,
+            'analytic': analytic,
+            'probes': probes,
+        }
+
+    def estimate_configuration(self, config, mean_interarrival_ms=None):
+        """
+        Аналитическая оценка конфигурации без симуляции (queueing.analyze_scenario):
+        установившийся режим событийной модели, формат — как у simulate_configuration
+        плюс максимальная загрузка Fog-узлов и облачных серверов.
+        """
+        estimate = analyze_scenario(self._scenario(config), mean_interarrival_ms)['stats']
+        return {
+            'avg_latency': estimate['avg_end_to_end'],
+            'p95_latency': estimate['p_end_to_end'],
+            'avg_fog_queue_delay': estimate['avg_fog_queue'],
+            'avg_cloud_queue_delay': estimate['avg_cloud_queue'],
+            'fog_utilization': estimate['max_fog_utilization'],
+            'cloud_utilization': estimate['max_cloud_utilization'],
+            'edge_per_fog': config['edge_devices'] / config['fog_nodes'],
+            'fog_per_cloud': config['fog_nodes'] / config['cloud_servers']
+        }
+
 def run_individual_experiment():
     """Индивидуальный эксперимент для варианта: Edge=100, Fog=20, Cloud=3"""
     print("=" * 80)
@@ -192,22 +324,25 @@ def analyze_sensitivity_edge_variation(analyzer):
         {'name': '+100%', 'edge_mult': 2.00, 'edge': int(base_edge * 2.00)}
     ]
     
-    results = []
-    
-    for var in variations:
-        config = {
+    configs = [
+        {
             'edge_devices': var['edge'],
             'fog_nodes': base_fog,
             'cloud_servers': base_cloud,
             'tasks': 200
         }
-        
+        for var in variations
+    ]
+    
+    # Конфигурации независимы — считаем их параллельно, порядок сохраняется
+    sweep_stats = analyzer.simulate_sweep(configs)
+    results = []
+    
+    for var, config, stats in zip(variations, configs, sweep_stats):
         print(f"\n🔍 Конфигурация: {var['name']}")
         print(f"   • Edge устройств: {config['edge_devices']}")
         print(f"   • Edge/Fog: {config['edge_devices']/config['fog_nodes']:.1f}")
         
-        stats, _ = analyzer.simulate_configuration(config)
-        
         result = {
             'Конфигурация': var['name'],
             'Edge устройств': config['edge_devices'],
@@ -237,7 +372,7 @@ def analyze_sensitivity_edge_variation(analyzer):
     for i, result in enumerate(results[1:], 1):
         growth = ((result['Средняя задержка (мс)'] - base_latency) / base_latency) * 100
         print(f"\n   При увеличении Edge на {result['Конфигурация'].split('+')[1]}:")
-        print(f"   • Задержка выросла на: +{growth:.1f}%")
+        print(f"   • Задержка выросла на: {growth:+.1f}%")
         print(f"   • Edge/Fog увеличилось с 5.0 до {result['Edge/Fog']:.1f}")
         print(f"   • Загрузка Fog выросла в {result['Ср. загрузка Fog (мс)']/results[0]['Ср. загрузка Fog (мс)']:.2f} раза")
     
@@ -264,22 +399,25 @@ def analyze_sensitivity_fog_variation(analyzer):
         {'name': '+50%', 'fog_mult': 1.50, 'fog': int(base_fog * 1.50)}
     ]
     
-    results = []
-    
-    for var in variations:
-        config = {
+    configs = [
+        {
             'edge_devices': base_edge,
             'fog_nodes': var['fog'],
             'cloud_servers': base_cloud,
             'tasks': 200
         }
-        
+        for var in variations
+    ]
+    
+    # Конфигурации независимы — считаем их параллельно, порядок сохраняется
+    sweep_stats = analyzer.simulate_sweep(configs)
+    results = []
+    
+    for var, config, stats in zip(variations, configs, sweep_stats):
         print(f"\n🔍 Конфигурация: {var['name']}")
         print(f"   • Fog узлов: {config['fog_nodes']}")
         print(f"   • Edge/Fog: {config['edge_devices']/config['fog_nodes']:.1f}")
         
-        stats, _ = analyzer.simulate_configuration(config)
-        
         result = {
             'Конфигурация': var['name'],
             'Fog узлов': config['fog_nodes'],
@@ -320,12 +458,19 @@ def analyze_sensitivity_fog_variation(analyzer):
     
     return results
 
-def analyze_sensitivity_cloud_variation(analyzer):
-    """Анализ чувствительности: изменение количества Cloud серверов"""
+def analyze_sensitivity_cloud_variation(analyzer, cloud_drain_probability=0.4):
+    """
+    Анализ чувствительности: изменение количества Cloud серверов.
+
+    Без очереди облака число серверов на задержку не влияет, поэтому она
+    включается явно: обработчик сервера завершает задачу за шаг с
+    вероятностью cloud_drain_probability.
+    """
     print("\n" + "=" * 80)
     print("АНАЛИЗ ЧУВСТВИТЕЛЬНОСТИ 3: ИЗМЕНЕНИЕ КОЛИЧЕСТВА CLOUD СЕРВЕРОВ")
     print("При фиксированном: Edge=100, Fog=20")
     print("Увеличение Cloud на: 100%, 200%, 300%")
+    print(f"Очередь облака: обработчик завершает задачу за шаг с вероятностью {cloud_drain_probability}")
     print("=" * 80)
     
     base_edge = analyzer.base_config['edge_devices']
@@ -339,22 +484,26 @@ def analyze_sensitivity_cloud_variation(analyzer):
         {'name': '+300%', 'cloud_mult': 4.00, 'cloud': int(base_cloud * 4.00)}
     ]
     
-    results = []
-    
-    for var in variations:
-        config = {
+    configs = [
+        {
             'edge_devices': base_edge,
             'fog_nodes': base_fog,
             'cloud_servers': var['cloud'],
+            'cloud_drain_probability': cloud_drain_probability,
             'tasks': 200
         }
-        
+        for var in variations
+    ]
+    
+    # Конфигурации независимы — считаем их параллельно, порядок сохраняется
+    sweep_stats = analyzer.simulate_sweep(configs)
+    results = []
+    
+    for var, config, stats in zip(variations, configs, sweep_stats):
         print(f"\n🔍 Конфигурация: {var['name']}")
         print(f"   • Cloud серверов: {config['cloud_servers']}")
         print(f"   • Fog/Cloud: {config['fog_nodes']/config['cloud_servers']:.1f}")
         
-        stats, _ = analyzer.simulate_configuration(config)
-        
         result = {
             'Конфигурация': var['name'],
             'Cloud серверов': config['cloud_servers'],
@@ -391,9 +540,227 @@ def analyze_sensitivity_cloud_variation(analyzer):
     
     return results
 
+def analyze_fog_variation_confidence(analyzer, target_half_width=0.02, max_replications=100, n_tasks=200):
+    """
+    Вариации Fog методом Монте-Карло: средняя задержка и P95 с 95%
+    доверительными интервалами. Различия, интервалы которых
+    перекрываются, статистически не значимы.
+
+    Точность ±2% при 200 задачах достигается за ~10 повторений; для более
+    узких интервалов увеличьте n_tasks. Если за max_replications
+    точность не достигнута, в столбце «Сошлось» — «нет».
+    """
+    print("\n" + "=" * 80)
+    print("ВАРИАЦИИ FOG С ДОВЕРИТЕЛЬНЫМИ ИНТЕРВАЛАМИ (МОНТЕ-КАРЛО)")
+    print(f"Точность: ±{target_half_width * 100:.1f}% от среднего, не более {max_replications} повторений, "
+          f"задач: {n_tasks}")
+    print("=" * 80)
+
+    base = analyzer.base_config
+    results = []
+    for mult in (1.00, 1.10, 1.20, 1.30, 1.40, 1.50):
+        config = dict(base, fog_nodes=int(base['fog_nodes'] * mult), tasks=n_tasks)
+        summary, _ = analyzer.simulate_replicated(config, target_half_width=target_half_width,
+                                                  max_replications=max_replications)
+        avg, p95 = summary['avg_latency'], summary['p95_latency']
+        converged = all(interval['half_width'] <= target_half_width * abs(interval['mean'])
+                        for interval in (avg, p95))
+        results.append({
+            'Конфигурация': f"+{(mult - 1) * 100:.0f}%",
+            'Fog узлов': config['fog_nodes'],
+            'Повторений': avg['n'],
+            'Сошлось': 'да' if converged else 'нет',
+            'Средняя задержка (мс)': avg['mean'],
+            '± (мс)': avg['half_width'],
+            'P95 задержка (мс)': p95['mean'],
+            '± P95 (мс)': p95['half_width'],
+        })
+
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    return results
+
+def analyze_placement_strategies(strategies=STRATEGIES, edge=10000, fog=1000, cloud=30,
+                                 n_tasks=30000, seed=42, scenario=SENSITIVITY_SCENARIO):
+    """
+    Сравнение стратегий размещения Edge → Fog (и Fog → Cloud) на большой
+    топологии: неравномерность нагрузки Fog-узлов и хвост задержек.
+    Считается векторным движком; seed общий для всех стратегий.
+    """
+    print("\n" + "=" * 80)
+    print("СРАВНЕНИЕ СТРАТЕГИЙ РАЗМЕЩЕНИЯ")
+    print(f"Edge={edge}, Fog={fog}, Cloud={cloud}, задач: {n_tasks}")
+    print("=" * 80)
+
+    results = []
+    for strategy in strategies:
+        placed = replace(scenario, edge_placement=strategy, cloud_placement=strategy).with_topology(edge, fog, cloud)
+        accumulator = PerformanceAccumulator()
+        simulator, _ = run_scenario(placed, n_tasks, seed, engine='vectorized',
+                                    accumulator=accumulator, record=False)
+        edges_per_fog = np.bincount(simulator.edge_devices.assigned_fog, minlength=fog)
+        stats = accumulator.stats()
+        results.append({
+            'Стратегия': strategy,
+            'Макс. Edge на Fog': int(edges_per_fog.max()),
+            'Макс./сред.': edges_per_fog.max() / edges_per_fog.mean(),
+            'Средняя задержка (мс)': stats['avg_end_to_end'],
+            'P95 (мс)': stats['p95_end_to_end'],
+            'P99 (мс)': stats['p99_end_to_end'],
+            'Ср. очередь Fog (мс)': stats['avg_fog_queue'],
+        })
+
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    return results
+
+def analyze_analytical_model(analyzer, configs=None, n_tasks=50000, seed=42, warmup=0.1):
+    """
+    Сверка аналитической оценки (queueing) с событийным движком.
+
+    Для каждой конфигурации симулятор и оценка используют одну и ту же
+    топологию (analyze_topology); первые warmup доли времени прогона
+    отбрасываются как переходный режим. Затем показывается время
+    аналитического перебора сетки конфигураций (estimate_configuration).
+    """
+    print("\n" + "=" * 80)
+    print("АНАЛИТИЧЕСКАЯ МОДЕЛЬ (M/G/1, ЭРЛАНГ C, КИНГМАН) И СВЕРКА С СИМУЛЯЦИЕЙ")
+    print(f"Событийный движок, задач: {n_tasks}, отброшено начало: {warmup * 100:.0f}%")
+    print("=" * 80)
+
+    base = analyzer.base_config
+    if configs is None:
+        configs = [dict(base),
+                   dict(base, fog_nodes=base['fog_nodes'] * 2),
+                   dict(base, cloud_servers=base['cloud_servers'] * 2),
+                   dict(base, edge_devices=base['edge_devices'] * 2, fog_nodes=base['fog_nodes'] * 2,
+                        cloud_servers=base['cloud_servers'] * 2)]
+
+    results = []
+    for config in configs:
+        scenario = analyzer.scenario.with_topology(
+            config['edge_devices'], config['fog_nodes'], config['cloud_servers'])
+        simulator, tasks = run_scenario(scenario, n_tasks, seed, engine='event')
+        estimate = analyze_topology(simulator)
+        stats = estimate['stats']
+        steady = tasks['arrival_time'] >= warmup * tasks['arrival_time'].max()
+        latency = tasks['end_to_end_latency'][steady].astype(np.float64)
+        results.append({
+            'Конфигурация': f"E={config['edge_devices']} F={config['fog_nodes']} C={config['cloud_servers']}",
+            'ρ Fog макс.': stats['max_fog_utilization'],
+            'ρ Cloud макс.': stats['max_cloud_utilization'],
+            'Средняя сим. (мс)': latency.mean(),
+            'Средняя анал. (мс)': stats['avg_end_to_end'],
+            'P95 сим. (мс)': np.percentile(latency, 95),
+            'P95 анал. (мс)': stats['p_end_to_end'],
+            'Ожид. Fog сим.': tasks['fog_queue_delay'][steady].mean(dtype=np.float64),
+            'Ожид. Fog анал.': stats['avg_fog_queue'],
+            'Ожид. Cloud сим.': tasks['cloud_queue_delay'][steady].mean(dtype=np.float64),
+            'Ожид. Cloud анал.': stats['avg_cloud_queue'],
+        })
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+
+    # Перебор сетки конфигураций только аналитически
+    grid = [dict(base, fog_nodes=fog, cloud_servers=cloud)
+            for fog in range(5, 205, 5) for cloud in range(1, 26)]
+    started = time.perf_counter()
+    estimates = [analyzer.estimate_configuration(config) for config in grid]
+    elapsed = time.perf_counter() - started
+    stable = [(config, estimate) for config, estimate in zip(grid, estimates) if np.isfinite(estimate['p95_latency'])]
+    print(f"\n   Аналитический перебор: {len(grid)} конфигураций за {elapsed * 1000:.0f} мс, "
+          f"устойчивых: {len(stable)}")
+    if stable:
+        # Наименьшая конфигурация с P95 не более чем на 10% хуже лучшей в сетке
+        best = min(estimate['p95_latency'] for _, estimate in stable)
+        config, estimate = min(((config, estimate) for config, estimate in stable
+                                if estimate['p95_latency'] <= 1.1 * best),
+                               key=lambda item: item[0]['fog_nodes'] + item[0]['cloud_servers'])
+        print(f"   Наименьшая конфигурация с P95 ≤ 110% лучшего: Fog={config['fog_nodes']}, "
+              f"Cloud={config['cloud_servers']} (ρ Fog {estimate['fog_utilization']:.2f}, "
+              f"ρ Cloud {estimate['cloud_utilization']:.2f}, P95 ≈ {estimate['p95_latency']:.1f} мс)")
+    return results
+
+def analyze_arrival_rate(analyzer, rates_per_edge_s=(0.25, 0.5, 0.75, 1.0, 1.25, 1.5),
+                         n_tasks=20000, seed=42, window_ms=1000.0):
+    """
+    Рост интенсивности пуассоновского потока (событийный движок, базовая
+    топология): пропускная способность, загрузка Fog и Cloud по окнам
+    времени и задержка. Интенсивности насыщения уровней — из
+    аналитической модели (ρ = 1 на самом загруженном узле).
+    """
+    print("\n" + "=" * 80)
+    print("ИНТЕНСИВНОСТЬ ПОТОКА ЗАДАЧ: ПРОПУСКНАЯ СПОСОБНОСТЬ И ЗАГРУЗКА")
+    print(f"Пуассоновский поток, задач: {n_tasks}, окно: {window_ms:.0f} мс")
+    print("=" * 80)
+
+    base = analyzer.base_config
+    results = []
+    for rate in rates_per_edge_s:
+        scenario = replace(analyzer.scenario, arrivals=PoissonArrivals(rate)).with_topology(
+            base['edge_devices'], base['fog_nodes'], base['cloud_servers'])
+        simulator, tasks = run_scenario(scenario, n_tasks, seed, engine='event')
+        timeline = windowed_metrics(tasks, simulator, window_ms)
+        estimate = analyze_topology(simulator)['stats']
+        results.append({
+            'Задач/с на Edge': rate,
+            'Поступление (задач/с)': scenario.arrivals.mean_rate_s(base['edge_devices']),
+            'Пропускная (задач/с)': timeline['throughput_s'],
+            'Загрузка Fog': float(np.mean(timeline['fog_utilization'])),
+            'Загрузка Cloud': float(np.mean(timeline['cloud_utilization'])),
+            'ρ макс. Fog (анал.)': estimate['max_fog_utilization'],
+            'ρ макс. Cloud (анал.)': estimate['max_cloud_utilization'],
+            'Средняя задержка (мс)': float(tasks['end_to_end_latency'].mean(dtype=np.float64)),
+            'P95 худшего окна (мс)': float(np.nanmax(timeline['latency_p'])),
+        })
+
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    # ρ пропорциональна интенсивности: насыщение — при rate / ρ_max
+    last = results[-1]
+    for tier in ('Fog', 'Cloud'):
+        rate = last['Задач/с на Edge'] / last[f'ρ макс. {tier} (анал.)']
+        print(f"   • {tier} насыщается при ≈ {rate:.2f} задач/с на устройство "
+              f"({rate * base['edge_devices']:.0f} задач/с всего)")
+    return results
+
+def analyze_capacity(slo_ms=300, metrics=('p95_latency', 'p99_latency'), rate_per_edge_s=1.0,
+                     n_tasks=10000, seed=42, scenario=SENSITIVITY_SCENARIO):
+    """
+    Поиск насыщения: сколько краевых устройств (по rate_per_edge_s задач/с
+    каждое) выдерживает базовая топология Fog и Cloud при SLO на квантиль
+    задержки (SensitivityAnalyzer.find_capacity, событийный движок).
+    """
+    print("\n" + "=" * 80)
+    print("ПОИСК НАСЫЩЕНИЯ: МАКСИМАЛЬНОЕ ЧИСЛО EDGE УСТРОЙСТВ ПРИ SLO")
+    print(f"SLO: {slo_ms} мс, поток: {rate_per_edge_s} задач/с на устройство, задач на прогон: {n_tasks}")
+    print("=" * 80)
+
+    analyzer = SensitivityAnalyzer(engine='event', scenario=replace(scenario, arrivals=PoissonArrivals(rate_per_edge_s)))
+    base = analyzer.base_config
+    results = []
+    for metric in metrics:
+        search = analyzer.find_capacity(slo_ms, metric, n_tasks=n_tasks, seed=seed)
+        print(f"\n🔍 {metric}: прогоны (Edge → {metric}, мс):")
+        for value, latency in search['probes']:
+            print(f"   • {value:>6} → {latency:10.2f} {'✅' if latency <= slo_ms else '❌'}")
+        if search['capacity'] is None:
+            print(f"   Ни один прогон не выдержал SLO (аналитически ≈ {search['analytic']})")
+            continue
+        capacity = dict(base, edge_devices=search['capacity'])
+        estimate = analyzer.estimate_configuration(capacity)
+        print(f"   Fog={base['fog_nodes']}, Cloud={base['cloud_servers']} выдерживают {search['capacity']} устройств "
+              f"(аналитически ≈ {search['analytic']}, прогонов: {len(search['probes'])}); "
+              f"загрузка: Fog {estimate['fog_utilization']:.2f}, Cloud {estimate['cloud_utilization']:.2f}")
+        results.append({
+            'Метрика': metric,
+            'Edge (симуляция)': search['capacity'],
+            'Edge (аналитика)': search['analytic'],
+            'Прогонов': len(search['probes']),
+            'Загрузка Fog': estimate['fog_utilization'],
+            'Загрузка Cloud': estimate['cloud_utilization'],
+        })
+    return results
+
 def plot_sensitivity_results(edge_results, fog_results, cloud_results):
     """Визуализация результатов анализа чувствительности"""
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig, axes = get_figure('sensitivity_results', 2, 2, figsize=(16, 12))
     
     # График 1: Влияние Edge устройств
     ax1 = axes[0, 0]
@@ -499,7 +866,7 @@ def plot_sensitivity_results(edge_results, fog_results, cloud_results):
     plt.suptitle('АНАЛИЗ ЧУВСТВИТЕЛЬНОСТИ СИСТЕМЫ: Edge=100, Fog=20, Cloud=3\n"Много Fog-узлов на малое количество Edge"', 
                  fontsize=14, fontweight='bold', y=1.02)
     plt.tight_layout()
-    plt.show()
+    finish_figure(fig, 'sensitivity_results')
 
 def generate_report(stats, edge_results, fog_results, cloud_results):
     """Генерация итогового отчета"""
@@ -551,8 +918,24 @@ def generate_report(stats, edge_results, fog_results, cloud_results):
     print("   3. Система демонстрирует хорошую масштабируемость при сохранении Edge/Fog < 10")
     print("   4. Архитектура 'много Fog на мало Edge' обеспечивает низкую задержку и высокую надежность")
 
-def main():
-    """Основная функция запуска эксперимента"""
+def report_from_store(directory, name='sensitivity'):
+    """Графики и отчёт по сохранённому прогону — без повторной симуляции"""
+    run = RunStore(directory).load(name)
+    tables = run.tables
+    plot_sensitivity_results(tables['edge'], tables['fog'], tables['cloud'])
+    generate_report(run.stats, tables['edge'], tables['fog'], tables['cloud'])
+    return run
+
+def main(run_store=None, monte_carlo=False, analytical=False, arrival_rate=False, capacity=False):
+    """
+    Основная функция запуска эксперимента
+
+    run_store — каталог для сохранения результатов; monte_carlo=True —
+    дополнительно вариации Fog с доверительными интервалами;
+    analytical=True — аналитическая модель и её сверка с симуляцией;
+    arrival_rate=True — пропускная способность при росте интенсивности потока;
+    capacity=True — поиск максимального числа Edge устройств при SLO.
+    """
     
     print("\n" + "=" * 100)
     print("ЛАБОРАТОРНАЯ РАБОТА: АНАЛИЗ ЧУВСТВИТЕЛЬНОСТИ РАСПРЕДЕЛЕННОЙ СИСТЕМЫ")
@@ -570,6 +953,18 @@ def main():
     edge_results = analyze_sensitivity_edge_variation(analyzer)
     fog_results = analyze_sensitivity_fog_variation(analyzer)
     cloud_results = analyze_sensitivity_cloud_variation(analyzer)
+    if monte_carlo:
+        analyze_fog_variation_confidence(analyzer)
+    if analytical:
+        analyze_analytical_model(analyzer)
+    if arrival_rate:
+        analyze_arrival_rate(analyzer)
+    if capacity:
+        analyze_capacity()
+    
+    if run_store is not None:
+        RunStore(run_store).save('sensitivity', tasks, stats, analyzer.base_config,
+                                 tables={'edge': edge_results, 'fog': fog_results, 'cloud': cloud_results})
     
     # 3. Визуализация
     plot_sensitivity_results(edge_results, fog_results, cloud_results)
@@ -0,0 +1,548 @@
+"""
+simkernel.py
+
+Единое параметризованное ядро симуляции Край → Туман → Облако.
+
+Все константы модели (ёмкость очереди, мс на задачу в очереди,
+вероятность обработки из очереди, диапазоны задержек) собраны в
+типизированном сценарии Scenario. На этом ядре работают и
+cloudfogedgepipeline (REFERENCE_SCENARIO), и анализ чувствительности
+scalingexperiment (SENSITIVITY_SCENARIO), поэтому любой движок
+(поэлементный, векторный, событийный) обслуживает обе точки входа.
+"""
+import math
+import random
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+import numpy as np
+
+from arrivals import ArrivalProcess
+from eventsim import simulate_event_driven
+from offload import CLOUD, SIBLING, STAY, OffloadPolicy, decide, limits
+from placement import assign
+from tasktable import TaskTable
+from topology import NodeTable
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Параметры модели распределённой системы (задержки — в мс)"""
+    edge_devices: int = 100
+    fog_nodes: int = 10
+    cloud_servers: int = 3
+    stationary_delay_range: Tuple[int, int] = (5, 15)
+    mobile_delay_range: Tuple[int, int] = (8, 20)
+    fog_delay_range: Tuple[int, int] = (30, 80)
+    fog_capacity_spread: Tuple[float, float] = (0.8, 1.2)
+    queue_capacity: int = 400
+    queue_delay_per_task: float = 2
+    overflow_penalty_ms: float = 10
+    drain_probability: float = 0.3
+    fog_to_cloud_range: Tuple[int, int] = (20, 50)
+    cloud_delay_range: Tuple[int, int] = (10, 30)
+    storage_capacity: int = 1000     # задач на облачном сервере (в обработке и в очереди)
+    cloud_concurrency: int = 1       # параллельных обработчиков на облачном сервере
+    cloud_drain_probability: Optional[float] = None  # вероятность, что обработчик облака завершит задачу за шаг
+                                                     # (None — без очереди облака в шаговых движках)
+    cloud_queue_delay_per_task: float = 2  # мс ожидания на задачу в очереди облака (на обработчик)
+    transfer_ms_per_kb: float = 0.08  # доп. задержка Edge → Fog на КБ полезной нагрузки трассы (≈ 100 Мбит/с)
+    edge_placement: str = 'random'   # стратегия назначения Edge → Fog (см. placement.STRATEGIES)
+    cloud_placement: str = 'random'  # стратегия назначения Fog → Cloud
+    offload: Optional[OffloadPolicy] = None  # разгрузка перегруженных Fog (None — штраф overflow_penalty_ms)
+    arrivals: Optional[ArrivalProcess] = None  # модель потока во времени (только событийный движок)
+
+    def with_topology(self, edge_devices=None, fog_nodes=None, cloud_servers=None):
+        """Тот же сценарий с другим числом устройств"""
+        return replace(
+            self,
+            edge_devices=self.edge_devices if edge_devices is None else edge_devices,
+            fog_nodes=self.fog_nodes if fog_nodes is None else fog_nodes,
+            cloud_servers=self.cloud_servers if cloud_servers is None else cloud_servers,
+        )
+
+
+# Эталонная архитектура (cloudfogedgepipeline)
+REFERENCE_SCENARIO = Scenario()
+
+# Вариант "много Fog на мало Edge" (scalingexperiment): узлы менее загружены,
+# производительность стабильнее, очередь меньше и разгружается чаще
+SENSITIVITY_SCENARIO = Scenario(
+    fog_nodes=20,
+    fog_delay_range=(25, 70),
+    fog_capacity_spread=(0.9, 1.1),
+    queue_capacity=30,
+    queue_delay_per_task=1,
+    drain_probability=0.5,
+)
+
+
+class DistributedSystemSimulator:
+    def __init__(self, n_edge_devices=None, n_fog_nodes=None, n_cloud_servers=None, scenario=REFERENCE_SCENARIO):
+        self.scenario = scenario.with_topology(n_edge_devices, n_fog_nodes, n_cloud_servers)
+        self.n_edge_devices = self.scenario.edge_devices
+        self.n_fog_nodes = self.scenario.fog_nodes
+        self.n_cloud_servers = self.scenario.cloud_servers
+        
+        # Инициализация устройств (топология компилируется в массивы NodeTable)
+        self.edge_devices = self._init_edge_devices()
+        self.fog_nodes = self._init_fog_nodes()
+        self.cloud_servers = self._init_cloud_servers()
+        self._place()
+    
+    def _place(self):
+        """Назначение по стратегиям размещения (кроме 'random' — оно выполняется при инициализации)"""
+        edges, fogs = self.edge_devices, self.fog_nodes
+        if self.scenario.edge_placement != 'random':
+            # Вес Fog-узла — его производительность: capacity_factor умножает задержку обработки
+            edges.assigned_fog[:] = assign(self.scenario.edge_placement, len(edges),
+                                           1.0 / fogs.capacity_factor,
+                                           keys=[f"Edge_{i}" for i in range(len(edges))])
+        if self.scenario.cloud_placement != 'random':
+            # Нагрузка Fog-узла на облако — число его краевых устройств
+            fogs.assigned_cloud[:] = assign(self.scenario.cloud_placement, len(fogs),
+                                            np.ones(len(self.cloud_servers)),
+                                            item_load=np.bincount(edges.assigned_fog, minlength=len(fogs)),
+                                            keys=[f"Fog_{i}" for i in range(len(fogs))])
+    
+    def _init_edge_devices(self):
+        """Инициализация краевых устройств (стационарные и мобильные)"""
+        n = self.n_edge_devices
+        processing_delay = np.empty(n, dtype=np.int32)
+        network_delay = np.empty(n, dtype=np.int32)
+        assigned_fog = np.zeros(n, dtype=np.int32)
+        # Мобильные устройства имеют немного другие характеристики:
+        # выше задержка и менее стабильное соединение
+        ranges = (self.scenario.stationary_delay_range, self.scenario.mobile_delay_range)
+        randint = random.randint
+        last_fog = self.n_fog_nodes - 1
+        random_fog = self.scenario.edge_placement == 'random'
+        # Порядок вызовов random тот же, что при построении списка словарей
+        for i in range(n):
+            low, high = ranges[i % 2]
+            processing_delay[i] = randint(low, high)  # мс
+            network_delay[i] = randint(low, high)     # мс
+            if random_fog:
+                assigned_fog[i] = randint(0, last_fog)
+        return NodeTable('Edge', {
+            'type': (np.arange(n) % 2).astype(np.int8),  # код из EDGE_TYPES
+            'processing_delay': processing_delay,
+            'network_delay': network_delay,
+            'assigned_fog': assigned_fog,
+        })
+    
+    def _init_fog_nodes(self):
+        """Инициализация Fog-узлов"""
+        n = self.n_fog_nodes
+        processing_low = np.empty(n, dtype=np.int32)
+        processing_high = np.empty(n, dtype=np.int32)
+        capacity_factor = np.empty(n, dtype=np.float64)
+        assigned_cloud = np.zeros(n, dtype=np.int32)
+        low, high = self.scenario.fog_delay_range
+        random_cloud = self.scenario.cloud_placement == 'random'
+        for i in range(n):
+            # Разные Fog-узлы могут иметь разную производительность
+            capacity_factor[i] = random.uniform(*self.scenario.fog_capacity_spread)
+            processing_low[i] = int(low * capacity_factor[i])
+            processing_high[i] = int(high * capacity_factor[i])
+            if random_cloud:
+                assigned_cloud[i] = random.randint(0, self.n_cloud_servers-1)
+        return NodeTable('Fog', {
+            'capacity_factor': capacity_factor,
+            'processing_low': processing_low,
+            'processing_high': processing_high,
+            'queue_capacity': np.full(n, self.scenario.queue_capacity, dtype=np.int32),
+            'current_queue': np.zeros(n, dtype=np.int64),
+            'assigned_cloud': assigned_cloud,
+            'processed_tasks': np.zeros(n, dtype=np.int64),
+            'queue_overflows': np.zeros(n, dtype=np.int64),
+            'offloaded_sibling': np.zeros(n, dtype=np.int64),
+            'offloaded_cloud': np.zeros(n, dtype=np.int64),
+            'busy_time': np.zeros(n, dtype=np.float64),
+        })
+    
+    def _init_cloud_servers(self):
+        """Инициализация облачных серверов"""
+        n = self.n_cloud_servers
+        # Облачные серверы обычно более производительные
+        low, high = self.scenario.cloud_delay_range  # мс
+        return NodeTable('Cloud', {
+            'processing_low': np.full(n, low, dtype=np.int32),
+            'processing_high': np.full(n, high, dtype=np.int32),
+            'storage_capacity': np.full(n, self.scenario.storage_capacity, dtype=np.int32),
+            'concurrency': np.full(n, self.scenario.cloud_concurrency, dtype=np.int32),
+            'current_queue': np.zeros(n, dtype=np.int64),
+            'pending_steps': np.zeros(n, dtype=np.int64),  # шаги с последнего прихода задачи
+            'queue_overflows': np.zeros(n, dtype=np.int64),
+            'processed_tasks': np.zeros(n, dtype=np.int64),
+            'busy_time': np.zeros(n, dtype=np.float64),
+        })
+
+def _completions(limit, trials, probability):
+    """
+    Число успехов среди trials испытаний Бернулли, но не больше limit.
+
+    Успехи перебираются геометрическими скачками, поэтому стоимость —
+    O(результата), а не O(trials): в среднем O(1) на задачу.
+    """
+    if probability >= 1:
+        return min(limit, trials)
+    if probability <= 0:
+        return 0
+    log_miss = math.log(1 - probability)
+    position = count = 0
+    while count < limit:
+        position += int(math.log(1.0 - random.random()) / log_miss) + 1  # номер следующего успеха
+        if position > trials:
+            break
+        count += 1
+    return count
+
+def _check_untimed(scenario):
+    """Поэлементный и векторный движки считают шагами-задачами, модельного времени в них нет"""
+    if scenario.arrivals is not None:
+        raise ValueError("Модель потока во времени (scenario.arrivals) поддерживается только "
+                         "событийным движком 'event'")
+
+def simulate_ethernet_architecture_custom(n_tasks=100, simulator=None, seed=42,
+                                          accumulator=None, record=True):
+    """
+    Симуляция эталонной архитектуры с кастомным симулятором
+
+    accumulator (PerformanceAccumulator) обновляется после каждой задачи;
+    при record=False задачи не сохраняются и функция возвращает None.
+    seed=None — продолжить текущую последовательность random без пересева.
+    """
+    if simulator is None:
+        simulator = DistributedSystemSimulator()
+    scenario = simulator.scenario
+    _check_untimed(scenario)
+    
+    if seed is not None:
+        random.seed(seed)
+    policy = scenario.offload
+    optional = ('cloud_queue_delay',) + (('offload',) if policy else ())
+    tasks = TaskTable.allocate(n_tasks, optional=optional) if record else None
+
+    # Топология — в списки Python: индексация списка в цикле быстрее скаляров NumPy
+    edges, fogs, clouds = simulator.edge_devices, simulator.fog_nodes, simulator.cloud_servers
+    edge_fog = edges.assigned_fog.tolist()
+    edge_type = edges.type.tolist()
+    edge_processing_delay = edges.processing_delay.tolist()
+    edge_network_delay = edges.network_delay.tolist()
+    fog_cloud = fogs.assigned_cloud.tolist()
+    fog_low = fogs.processing_low.tolist()
+    fog_high = fogs.processing_high.tolist()
+    fog_capacity = fogs.queue_capacity.tolist()
+    fog_queue = fogs.current_queue.tolist()
+    fog_processed = [0] * len(fogs)
+    fog_overflows = [0] * len(fogs)
+    fog_to_sibling = [0] * len(fogs)
+    fog_to_cloud = [0] * len(fogs)
+    if policy is not None:
+        offload_limits = limits(policy, fog_capacity)
+        offload_trigger = offload_limits[2]
+    cloud_low = clouds.processing_low.tolist()
+    cloud_high = clouds.processing_high.tolist()
+    cloud_processed = [0] * len(clouds)
+    cloud_concurrency = clouds.concurrency.tolist()
+    cloud_capacity = clouds.storage_capacity.tolist()
+    cloud_queue = clouds.current_queue.tolist()
+    cloud_overflows = [0] * len(clouds)
+    # Номер шага последнего прихода (с учётом шагов прошлых прогонов)
+    cloud_last = (-1 - clouds.pending_steps).tolist()
+    
+    for task_id in range(n_tasks):
+        # Случайное краевое устройство генерирует задачу
+        edge = random.randrange(len(edge_fog))
+        fog = edge_fog[edge]
+        
+        # Разгрузка перегруженного Fog-узла: соседний узел или облако
+        offload = STAY
+        if policy is not None and fog_queue[fog] >= offload_trigger[fog]:
+            offload, target = decide(policy, fog, fog_queue.__getitem__, offload_limits, random.randrange)
+            if offload == SIBLING:
+                fog_to_sibling[fog] += 1
+            elif offload == CLOUD:
+                fog_to_cloud[fog] += 1
+            fog = target
+        cloud = fog_cloud[fog]
+        
+        # Задержки на каждом этапе
+        edge_processing = edge_processing_delay[edge]
+        edge_to_fog_network = edge_network_delay[edge]
+        if offload == SIBLING:
+            edge_to_fog_network += policy.sibling_hop_ms
+        
+        fog_processing = random.randint(fog_low[fog], fog_high[fog])
+        fog_queue_delay = fog_queue[fog] * scenario.queue_delay_per_task  # мс на задачу в очереди
+        
+        fog_to_cloud_network = random.randint(*scenario.fog_to_cloud_range)  # Более высокая задержка до облака
+        cloud_processing = random.randint(cloud_low[cloud], cloud_high[cloud])
+        
+        # Обновление очереди Fog-узла
+        if offload == CLOUD:
+            # Fog-этап выполняет облако, очередь узла не растёт
+            cloud_processing += fog_processing / policy.cloud_speedup
+            fog_processing = fog_queue_delay = 0
+        elif fog_queue[fog] < fog_capacity[fog]:
+            fog_queue[fog] += 1
+        else:
+            fog_overflows[fog] += 1
+            fog_queue_delay += scenario.overflow_penalty_ms  # Штраф за переполнение очереди
+        
+        # Очередь облачного сервера: c обработчиков, каждый за шаг (одну задачу
+        # системы) завершает задачу с вероятностью cloud_drain_probability
+        cloud_queue_delay = 0
+        if scenario.cloud_drain_probability is not None:
+            servers = cloud_concurrency[cloud]
+            cloud_queue[cloud] -= _completions(cloud_queue[cloud], (task_id - cloud_last[cloud]) * servers,
+                                               scenario.cloud_drain_probability)
+            cloud_last[cloud] = task_id
+            cloud_queue_delay = max(0, cloud_queue[cloud] - servers + 1) * scenario.cloud_queue_delay_per_task / servers
+            if cloud_queue[cloud] < cloud_capacity[cloud]:
+                cloud_queue[cloud] += 1
+            else:
+                cloud_overflows[cloud] += 1
+                cloud_queue_delay += scenario.overflow_penalty_ms
+        
+        # Общая сквозная задержка
+        end_to_end_latency = (edge_processing + edge_to_fog_network + 
+                             fog_processing + fog_queue_delay + 
+                             fog_to_cloud_network + cloud_processing + cloud_queue_delay)
+        
+        if record:
+            tasks.set_row(task_id, edge, edge_type[edge], fog, cloud,
+                          (edge_processing, edge_to_fog_network, fog_processing, fog_queue_delay,
+                           fog_to_cloud_network, cloud_processing, end_to_end_latency))
+            tasks['cloud_queue_delay'][task_id] = cloud_queue_delay
+            if policy is not None:
+                tasks['offload'][task_id] = offload
+        if accumulator is not None:
+            accumulator.add(edge_processing, fog_processing, fog_queue_delay, cloud_processing + cloud_queue_delay,
+                            edge_to_fog_network + fog_to_cloud_network, end_to_end_latency)
+        
+        # Уменьшение очереди Fog-узла (обработка задач)
+        if random.random() < scenario.drain_probability:  # вероятность обработать задачу из очереди
+            if fog_queue[fog] > 0:
+                fog_queue[fog] -= 1
+                fog_processed[fog] += 1
+        
+        # Обновление статистики облачного сервера
+        cloud_processed[cloud] += 1
+    
+    # Итоговое состояние узлов — обратно в массивы топологии
+    fogs.current_queue[:] = fog_queue
+    fogs.processed_tasks += fog_processed
+    fogs.queue_overflows += fog_overflows
+    fogs.offloaded_sibling += fog_to_sibling
+    fogs.offloaded_cloud += fog_to_cloud
+    clouds.processed_tasks += cloud_processed
+    clouds.current_queue[:] = cloud_queue
+    clouds.queue_overflows += cloud_overflows
+    clouds.pending_steps[:] = [n_tasks - 1 - last for last in cloud_last]
+    return tasks
+
+def simulate_ethernet_architecture_vectorized(n_tasks=100, simulator=None, seed=42,
+                                              accumulator=None, record=True):
+    """
+    Пакетная симуляция эталонной архитектуры на NumPy.
+
+    Все задержки этапов генерируются массивами за один проход, очередь
+    каждого Fog-узла вычисляется векторно. Модель очереди та же, что в
+    simulate_ethernet_architecture_custom, но последовательность случайных
+    чисел другая (numpy.random.Generator), поэтому результаты совпадают
+    статистически, а не поэлементно. Один и тот же seed даёт один и тот же
+    результат.
+
+    Возвращает TaskTable (None при record=False): идентификаторы устройств
+    хранятся как целые индексы, тип устройства — как код из EDGE_TYPES.
+    seed=None — seed берётся из текущей последовательности random.
+    """
+    if simulator is None:
+        simulator = DistributedSystemSimulator()
+
+    rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+    edge_idx = rng.integers(0, len(simulator.edge_devices), size=n_tasks)
+    tasks = simulate_batch(simulator, edge_idx, rng)
+    if accumulator is not None:
+        accumulator.add_table(tasks)
+    return tasks if record else None
+
+def simulate_batch(simulator, edge_idx, rng):
+    """
+    Пакет задач с заданными краевыми устройствами edge_idx (в порядке поступления).
+
+    Состояние очередей Fog-узлов и облачных серверов берётся из симулятора и записывается
+    обратно, поэтому последовательные пакеты продолжают одну симуляцию.
+    Возвращает TaskTable.
+    """
+    scenario = simulator.scenario
+    if scenario.offload is not None:
+        raise ValueError("Политика разгрузки зависит от состояния очередей задача за задачей и "
+                         "не поддерживается векторным движком: используйте 'loop' или 'event'")
+    _check_untimed(scenario)
+    n_tasks = len(edge_idx)
+
+    # Скомпилированная топология (массивы NodeTable)
+    edges, fogs, clouds = simulator.edge_devices, simulator.fog_nodes, simulator.cloud_servers
+    fog_capacity = fogs.queue_capacity.astype(np.int64)
+    fog_queue0 = fogs.current_queue.copy()
+
+    # Маршрутизация и задержки этапов — одним проходом
+    fog_idx = edges.assigned_fog[edge_idx]
+    cloud_idx = fogs.assigned_cloud[fog_idx]
+
+    edge_processing = edges.processing_delay[edge_idx]
+    edge_to_fog_network = edges.network_delay[edge_idx]
+    fog_processing = rng.integers(fogs.processing_low[fog_idx], fogs.processing_high[fog_idx], endpoint=True)
+    fog_to_cloud_network = rng.integers(*scenario.fog_to_cloud_range, size=n_tasks, endpoint=True)
+    cloud_processing = rng.integers(clouds.processing_low[cloud_idx], clouds.processing_high[cloud_idx],
+                                    endpoint=True)
+    drained = rng.random(n_tasks) < scenario.drain_probability  # обработка задачи из очереди
+
+    # Очередь Fog-узла: после поступления задачи очередь a = min(q + 1, cap) >= 1,
+    # затем она уменьшается на d (0 или 1). Значит a_{k+1} = min(a_k + 1 - d_k, cap),
+    # т.е. a — ограниченная сверху накопленная сумма, считаемая через cumsum
+    # внутри каждого узла (задачи узла упорядочены по номеру).
+    order = np.argsort(fog_idx, kind='stable')
+    fog_sorted = fog_idx[order]
+    drained_sorted = drained[order].astype(np.int64)
+    step = 1 - drained_sorted
+
+    is_start = np.ones(n_tasks, dtype=bool)
+    is_start[1:] = fog_sorted[1:] != fog_sorted[:-1]
+    starts = np.flatnonzero(is_start)
+    segment = np.cumsum(is_start) - 1
+
+    exclusive = np.cumsum(step) - step
+    exclusive -= exclusive[starts][segment]
+
+    capacity = fog_capacity[fog_sorted]
+    after_arrival = np.minimum(np.minimum(fog_queue0[fog_sorted] + 1, capacity) + exclusive, capacity)
+
+    queue_before = np.empty(n_tasks, dtype=np.int64)
+    queue_before[1:] = after_arrival[:-1] - drained_sorted[:-1]
+    queue_before[starts] = fog_queue0[fog_sorted[starts]]
+
+    overflow = queue_before >= capacity
+    fog_queue_delay = np.empty(n_tasks, dtype=np.float64)
+    fog_queue_delay[order] = (queue_before * scenario.queue_delay_per_task +
+                              overflow * scenario.overflow_penalty_ms)
+
+    # Итоговое состояние узлов — как после последовательной симуляции
+    if n_tasks:
+        ends = np.r_[starts[1:], n_tasks] - 1
+        fogs.current_queue[fog_sorted[starts]] = after_arrival[ends] - drained_sorted[ends]
+    fogs.processed_tasks += np.bincount(fog_idx[drained], minlength=len(fogs))
+    fogs.queue_overflows += np.bincount(fog_sorted[overflow], minlength=len(fogs))
+    clouds.processed_tasks += np.bincount(cloud_idx, minlength=len(clouds))
+
+    cloud_queue_delay = _cloud_queue_batch(scenario, clouds, cloud_idx, rng)
+
+    end_to_end_latency = (edge_processing + edge_to_fog_network +
+                          fog_processing + fog_queue_delay +
+                          fog_to_cloud_network + cloud_processing + cloud_queue_delay)
+
+    return TaskTable({
+        'edge_device': edge_idx,
+        'edge_type': edges.type[edge_idx],
+        'fog_node': fog_idx,
+        'cloud_server': cloud_idx,
+        'edge_processing': edge_processing,
+        'edge_to_fog_network': edge_to_fog_network,
+        'fog_processing': fog_processing,
+        'fog_queue_delay': fog_queue_delay,
+        'fog_to_cloud_network': fog_to_cloud_network,
+        'cloud_processing': cloud_processing,
+        'end_to_end_latency': end_to_end_latency,
+        'cloud_queue_delay': cloud_queue_delay,
+    })
+
+def _cloud_queue_batch(scenario, clouds, cloud_idx, rng):
+    """
+    Ожидание в очередях облачных серверов для пакета задач (как в цикловом движке).
+
+    Между соседними приходами на сервер проходит gap шагов, за них c
+    обработчиков завершают D ~ Binomial(gap * c, p) задач, поэтому очередь
+    после прихода a_k = clamp(a_{k-1} + 1 - D_k, 1, cap). Композиция
+    таких отображений x -> clamp(x + s, lo, hi) снова имеет этот вид,
+    так что все a_k считаются сегментированным префиксным сканированием
+    (Хиллис — Стил) за O(n log n) векторных операций. При
+    scenario.cloud_drain_probability = None очереди нет — ожидание нулевое.
+    """
+    n_tasks = len(cloud_idx)
+    cloud_queue_delay = np.zeros(n_tasks, dtype=np.float64)
+    if scenario.cloud_drain_probability is None:
+        return cloud_queue_delay
+    clouds.pending_steps += n_tasks
+    if not n_tasks:
+        return cloud_queue_delay
+
+    order = np.argsort(cloud_idx, kind='stable')
+    cloud_sorted = cloud_idx[order]
+    is_start = np.ones(n_tasks, dtype=bool)
+    is_start[1:] = cloud_sorted[1:] != cloud_sorted[:-1]
+    starts = np.flatnonzero(is_start)
+    seg_start = starts[np.cumsum(is_start) - 1]
+
+    # Шаги с предыдущего прихода на тот же сервер (для первого — с учётом прошлых пакетов)
+    gap = np.empty(n_tasks, dtype=np.int64)
+    gap[1:] = order[1:] - order[:-1]
+    gap[starts] = order[starts] + 1 + clouds.pending_steps[cloud_sorted[starts]] - n_tasks
+    servers = clouds.concurrency[cloud_sorted].astype(np.int64)
+    completed = rng.binomial(gap * servers, scenario.cloud_drain_probability)
+
+    capacity = clouds.storage_capacity[cloud_sorted].astype(np.int64)
+    shift = 1 - completed
+    low = np.minimum(1, capacity)
+    high = capacity.copy()
+    position = np.arange(n_tasks)
+    distance = 1
+    while distance < n_tasks:
+        combine = np.flatnonzero(position[distance:] - distance >= seg_start[distance:]) + distance
+        earlier = combine - distance
+        new_low = np.clip(low[earlier] + shift[combine], low[combine], high[combine])
+        new_high = np.clip(high[earlier] + shift[combine], low[combine], high[combine])
+        shift[combine] += shift[earlier]
+        low[combine], high[combine] = new_low, new_high
+        distance *= 2
+
+    queue0 = clouds.current_queue[cloud_sorted]
+    after_arrival = np.clip(queue0 + shift, low, high)
+    previous = np.empty(n_tasks, dtype=np.int64)
+    previous[1:] = after_arrival[:-1]
+    previous[starts] = queue0[starts]
+    queue_before = np.maximum(previous - completed, 0)
+
+    overflow = queue_before >= capacity
+    cloud_queue_delay[order] = (np.maximum(queue_before - servers + 1, 0) *
+                                scenario.cloud_queue_delay_per_task / servers +
+                                overflow * scenario.overflow_penalty_ms)
+
+    ends = np.r_[starts[1:], n_tasks] - 1
+    clouds.current_queue[cloud_sorted[starts]] = after_arrival[ends]
+    clouds.pending_steps[cloud_sorted[starts]] = n_tasks - 1 - order[ends]
+    clouds.queue_overflows += np.bincount(cloud_sorted[overflow], minlength=len(clouds))
+    return cloud_queue_delay
+
+# Доступные движки симуляции (ключ CONFIG['engine'])
+ENGINES = {
+    'loop': simulate_ethernet_architecture_custom,
+    'vectorized': simulate_ethernet_architecture_vectorized,
+    'event': simulate_event_driven,
+}
+
+def run_scenario(scenario, n_tasks=200, seed=42, engine='loop', accumulator=None, record=True):
+    """
+    Прогон сценария: seed задаёт и топологию, и задачи.
+
+    random пересевается один раз перед построением топологии, затем движок
+    продолжает ту же последовательность (seed=None), поэтому прогон полностью
+    определяется (scenario, seed, n_tasks, engine).
+    Возвращает (simulator, tasks).
+    """
+    random.seed(seed)
+    simulator = DistributedSystemSimulator(scenario=scenario)
+    tasks = ENGINES[engine](n_tasks, simulator, seed=None, accumulator=accumulator, record=record)
+    return simulator, tasks
@@ -0,0 +1,138 @@
+"""
+tasktable.py
+
+Компактное столбцовое хранилище результатов симуляции (TaskTable).
+
+Вместо списка словарей с 12 ключами и строковыми идентификаторами
+('Edge_42', 'Fog_3') каждая характеристика задачи хранится отдельным
+типизированным массивом NumPy: устройства — целыми индексами, тип
+краевого устройства — категориальным кодом.
+"""
+import numpy as np
+
+# Категории типа краевого устройства (код = индекс в кортеже)
+EDGE_TYPES = ("стационарный", "мобильный")
+
+# Столбцы таблицы и их типы
+INDEX_COLUMNS = {
+    'edge_device': np.int32,
+    'edge_type': np.int8,
+    'fog_node': np.int32,
+    'cloud_server': np.int32,
+}
+DELAY_COLUMNS = (
+    'edge_processing',
+    'edge_to_fog_network',
+    'fog_processing',
+    'fog_queue_delay',
+    'fog_to_cloud_network',
+    'cloud_processing',
+    'end_to_end_latency',
+)
+# float32 — около 7 значащих цифр: целые мс представлены точно до 2**24 мс
+# (≈ 4,6 ч), непрерывные задержки событийной модели — с относительной
+# погрешностью до 6e-8 (меньше 0,01 мс при задержках до ~2 мин). Абсолютное
+# время поступления (arrival_time) растёт с длиной прогона и хранится в float64
+DELAY_DTYPE = np.float32
+# Необязательные столбцы (есть только у движков, которые их заполняют)
+OPTIONAL_COLUMNS = {
+    'arrival_time': np.float64,
+    'cloud_queue_delay': DELAY_DTYPE,
+    'offload': np.int8,  # решение политики разгрузки (offload.STAY / SIBLING / CLOUD)
+}
+
+
+class TaskTable:
+    """Столбцовая таблица задач: по одному массиву на каждую характеристику"""
+
+    COLUMNS = tuple(INDEX_COLUMNS) + DELAY_COLUMNS
+
+    def __init__(self, columns):
+        n_tasks = None
+        self._columns = {}
+        for name in self.COLUMNS:
+            dtype = INDEX_COLUMNS.get(name, DELAY_DTYPE)
+            column = np.ascontiguousarray(columns[name], dtype=dtype)
+            if n_tasks is None:
+                n_tasks = len(column)
+            elif len(column) != n_tasks:
+                raise ValueError(f"Столбец {name} имеет длину {len(column)}, ожидалось {n_tasks}")
+            self._columns[name] = column
+        for name, dtype in OPTIONAL_COLUMNS.items():
+            if name in columns:
+                column = np.ascontiguousarray(columns[name], dtype=dtype)
+                if len(column) != n_tasks:
+                    raise ValueError(f"Столбец {name} имеет длину {len(column)}, ожидалось {n_tasks}")
+                self._columns[name] = column
+
+    @classmethod
+    def allocate(cls, n_tasks, optional=()):
+        """Пустая таблица на n_tasks строк для построчного заполнения"""
+        dtypes = {name: INDEX_COLUMNS.get(name, DELAY_DTYPE) for name in cls.COLUMNS}
+        dtypes.update((name, OPTIONAL_COLUMNS[name]) for name in optional)
+        return cls({name: np.zeros(n_tasks, dtype=dtype) for name, dtype in dtypes.items()})
+
+    @classmethod
+    def from_records(cls, records):
+        """Преобразование старого формата (список словарей) в таблицу"""
+        def index(value):
+            return int(value.rsplit('_', 1)[1]) if isinstance(value, str) else int(value)
+
+        columns = {name: [] for name in cls.COLUMNS}
+        for record in records:
+            columns['edge_device'].append(index(record['edge_device']))
+            columns['edge_type'].append(EDGE_TYPES.index(record['edge_type']))
+            columns['fog_node'].append(index(record['fog_node']))
+            columns['cloud_server'].append(index(record['cloud_server']))
+            for name in DELAY_COLUMNS:
+                columns[name].append(record[name])
+        return cls(columns)
+
+    def add_column(self, name, values):
+        """Добавить необязательный столбец из OPTIONAL_COLUMNS"""
+        column = np.ascontiguousarray(values, dtype=OPTIONAL_COLUMNS[name])
+        if len(column) != len(self):
+            raise ValueError(f"Столбец {name} имеет длину {len(column)}, ожидалось {len(self)}")
+        self._columns[name] = column
+
+    def __len__(self):
+        return len(self._columns['end_to_end_latency'])
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['_columns'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def columns(self):
+        """Имена присутствующих столбцов (включая необязательные)"""
+        return tuple(self._columns)
+
+    @property
+    def task_id(self):
+        return np.arange(len(self))
+
+    def type_mask(self, edge_type):
+        """Маска задач, сгенерированных устройствами данного типа"""
+        return self._columns['edge_type'] == EDGE_TYPES.index(edge_type)
+
+    def set_row(self, i, edge_device, edge_type, fog_node, cloud_server, delays):
+        """Запись одной строки (используется пошаговыми симуляторами); edge_type — код из EDGE_TYPES"""
+        self._columns['edge_device'][i] = edge_device
+        self._columns['edge_type'][i] = edge_type
+        self._columns['fog_node'][i] = fog_node
+        self._columns['cloud_server'][i] = cloud_server
+        for name, value in zip(DELAY_COLUMNS, delays):
+            self._columns[name][i] = value
+
+    @property
+    def nbytes(self):
+        """Объём памяти, занимаемый столбцами (байт)"""
+        return sum(column.nbytes for column in self._columns.values())
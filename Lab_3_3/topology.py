@@ -0,0 +1,82 @@
+"""
+topology.py
+
+Скомпилированная топология Край → Туман → Облако.
+
+Узлы одного уровня хранятся в NodeTable — по массиву NumPy на каждое
+поле (задержки, назначения, счётчики), а не списком словарей. Маршрут
+задачи edge → fog → cloud — это два обращения по индексу к целым
+массивам assigned_fog / assigned_cloud, для пакета задач — одна
+выборка (gather). Топология на 100 тыс. устройств занимает единицы
+мегабайт.
+
+Для совместимости узел по-прежнему доступен как запись с ключами
+словаря: simulator.fog_nodes[3]['current_queue'] читает и изменяет
+соответствующую ячейку массива.
+"""
+import numpy as np
+
+from tasktable import EDGE_TYPES
+
+
+class NodeRecord:
+    """Представление одной строки NodeTable с доступом как к словарю"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        table, i = self._table, self._index
+        if key == 'id':
+            return f"{table.prefix}_{i}"
+        if key == 'type':
+            return EDGE_TYPES[table.columns['type'][i]]
+        if key == 'processing_delay_range':
+            return (int(table.columns['processing_low'][i]), int(table.columns['processing_high'][i]))
+        return table.columns[key][i].item()
+
+    def __setitem__(self, key, value):
+        self._table.columns[key][self._index] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={self[name]!r}" for name in self._table.columns)
+        return f"{self['id']}({fields})"
+
+
+class NodeTable:
+    """Узлы одного уровня архитектуры: столбцы NumPy, строка — узел"""
+
+    def __init__(self, prefix, columns):
+        self.prefix = prefix
+        self.columns = {name: np.asarray(column) for name, column in columns.items()}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return NodeRecord(self, index % len(self))
+
+    def __iter__(self):
+        return (NodeRecord(self, i) for i in range(len(self)))
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def nbytes(self):
+        """Объём памяти, занимаемый столбцами (байт)"""
+        return sum(column.nbytes for column in self.columns.values())
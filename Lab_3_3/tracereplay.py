@@ -0,0 +1,122 @@
+"""
+tracereplay.py
+
+Прогон записанных трасс краевых устройств через модель Туман → Облако.
+
+Трасса — последовательность задач в порядке поступления, для каждой:
+  • edge_id        — индекс краевого устройства (0 .. n_edge_devices-1)
+  • timestamp_ms   — время поступления, мс
+  • payload_bytes  — размер полезной нагрузки, байт
+
+Поддерживаются CSV с заголовком edge_id,timestamp_ms,payload_bytes и
+двоичный формат — плоский массив записей TRACE_DTYPE (см.
+write_binary_trace). Файл читается блоками по chunk_size задач и подаётся
+в событийный движок (eventsim) как поток поступлений: очереди Fog-узлов
+и облака видят реальные интервалы между задачами трассы (всплески и
+паузы), а полезная нагрузка добавляет scenario.transfer_ms_per_kb за
+каждый КБ к задержке Edge → Fog. Трасса должна быть упорядочена по
+timestamp_ms; модельное время отсчитывается от первой задачи.
+
+simulate_trace хранит только задачи «в полёте» и блок трассы, поэтому
+память не зависит от длины трассы; replay_trace возвращает полную
+таблицу задач (для windowed_metrics и анализа по задачам).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from eventsim import simulate_event_driven
+from onlinestats import PerformanceAccumulator
+from simkernel import DistributedSystemSimulator
+
+# Запись двоичной трассы (16 байт)
+TRACE_DTYPE = np.dtype([
+    ('edge_id', '<i4'),
+    ('payload_bytes', '<i4'),
+    ('timestamp_ms', '<f8'),
+])
+TRACE_FIELDS = ('edge_id', 'timestamp_ms', 'payload_bytes')
+DEFAULT_CHUNK = 1 << 20
+
+
+def _is_binary(path):
+    return os.path.splitext(path)[1].lower() in ('.bin', '.trace')
+
+
+def read_trace_chunks(path, chunk_size=DEFAULT_CHUNK):
+    """Блоки трассы — структурированные массивы TRACE_DTYPE длиной не больше chunk_size"""
+    if _is_binary(path):
+        records = np.memmap(path, dtype=TRACE_DTYPE, mode='r')
+        for start in range(0, len(records), chunk_size):
+            yield np.array(records[start:start + chunk_size])
+        return
+
+    reader = pd.read_csv(path, usecols=list(TRACE_FIELDS), chunksize=chunk_size,
+                         dtype={'edge_id': np.int32, 'timestamp_ms': np.float64,
+                                'payload_bytes': np.int32})
+    for frame in reader:
+        chunk = np.empty(len(frame), dtype=TRACE_DTYPE)
+        for field in TRACE_FIELDS:
+            chunk[field] = frame[field].to_numpy()
+        yield chunk
+
+
+def write_binary_trace(path, chunks):
+    """Записать блоки трассы (например, из read_trace_chunks для CSV) в двоичный файл"""
+    with open(path, 'wb') as f:
+        for chunk in chunks:
+            np.asarray(chunk, dtype=TRACE_DTYPE).tofile(f)
+
+
+def count_trace(path, chunk_size=DEFAULT_CHUNK):
+    """Число задач в трассе (для двоичной — по размеру файла, для CSV — одним проходом)"""
+    if _is_binary(path):
+        return os.path.getsize(path) // TRACE_DTYPE.itemsize
+    return sum(len(frame) for frame in pd.read_csv(path, usecols=['edge_id'], chunksize=chunk_size))
+
+
+def trace_arrivals(path, simulator, chunk_size=DEFAULT_CHUNK):
+    """
+    Блоки трассы в формате потока поступлений eventsim: (timestamp_ms,
+    индекс устройства, задержка передачи нагрузки Edge → Fog, мс)
+    """
+    n_edge = len(simulator.edge_devices)
+    ms_per_byte = simulator.scenario.transfer_ms_per_kb / 1024
+    for chunk in read_trace_chunks(path, chunk_size):
+        edge_idx = chunk['edge_id'].astype(np.int64)
+        if len(edge_idx) and (edge_idx.min() < 0 or edge_idx.max() >= n_edge):
+            raise ValueError(f"edge_id вне диапазона 0..{n_edge - 1} в трассе {path}")
+        yield chunk['timestamp_ms'], edge_idx, chunk['payload_bytes'] * ms_per_byte
+
+
+def replay_trace(path, simulator=None, seed=42, chunk_size=DEFAULT_CHUNK, accumulator=None):
+    """
+    Событийная симуляция трассы: TaskTable со столбцами arrival_time
+    (от первой задачи трассы) и cloud_queue_delay.
+
+    Случайны только задержки обработки и сети Fog → Cloud; устройства,
+    моменты поступления и размер нагрузки берутся из трассы.
+    """
+    if simulator is None:
+        simulator = DistributedSystemSimulator()
+    return simulate_event_driven(count_trace(path, chunk_size), simulator, seed,
+                                 block_size=chunk_size, accumulator=accumulator,
+                                 arrival_stream=trace_arrivals(path, simulator, chunk_size))
+
+
+def simulate_trace(path, simulator=None, seed=42, chunk_size=DEFAULT_CHUNK, accumulator=None):
+    """
+    Прогон всей трассы с потоковой статистикой.
+
+    Возвращает PerformanceAccumulator (stats() — метрики в формате
+    analyze_performance); таблица задач не строится.
+    """
+    if simulator is None:
+        simulator = DistributedSystemSimulator()
+    if accumulator is None:
+        accumulator = PerformanceAccumulator()
+    simulate_event_driven(count_trace(path, chunk_size), simulator, seed, record=False,
+                          block_size=chunk_size, accumulator=accumulator,
+                          arrival_stream=trace_arrivals(path, simulator, chunk_size))
+    return accumulator
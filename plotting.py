@@ -0,0 +1,112 @@
+"""
+plotting.py
+
+Общий модуль графиков для Lab_3_2 и Lab_3_3 (скрипты лабораторных
+добавляют корень репозитория в sys.path).
+
+Вывод графиков: на экран (plt.show) или, в пакетном режиме без GUI,
+в файлы PNG/SVG через бэкенд Agg.
+
+Пакетный режим включается переменной окружения PLOT_OUTPUT_DIR
+(форматы — PLOT_FORMATS, например "png,svg"), вызовом configure_output()
+или автоматически, если нет дисплея. Фигуры кэшируются по ключу и
+переиспользуются между сценариями, длинные ряды прореживаются
+(min/max по корзинам), чтобы отрисовка 1M точек оставалась быстрой.
+"""
+import os
+import sys
+
+import matplotlib
+import numpy as np
+
+# Максимум точек линии на графике — остальные прореживаются
+MAX_POINTS = 5000
+
+_output = {'directory': None, 'formats': ('png',)}
+_figures = {}
+
+
+def _has_display():
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def configure_output(directory=None, formats=('png',)):
+    """Включить пакетный режим: графики сохраняются в directory, а не показываются"""
+    _output['directory'] = directory
+    _output['formats'] = tuple(formats)
+    if directory is not None:
+        matplotlib.use('Agg')
+
+
+if os.environ.get('PLOT_OUTPUT_DIR'):
+    configure_output(os.environ['PLOT_OUTPUT_DIR'],
+                     os.environ.get('PLOT_FORMATS', 'png').split(','))
+elif not _has_display():
+    configure_output('plots', os.environ.get('PLOT_FORMATS', 'png').split(','))
+
+import matplotlib.pyplot as plt  # noqa: E402  (после выбора бэкенда)
+
+
+def get_figure(key, nrows=1, ncols=1, figsize=None, **subplot_kw):
+    """
+    Фигура с сеткой осей nrows × ncols, переиспользуемая по ключу key.
+
+    Повторный вызов очищает фигуру (вместе с suptitle) и строит сетку
+    осей заново вместо создания новой фигуры, затем делает фигуру текущей
+    (для кода в стиле plt.subplot). Фигура, окно которой закрыто после
+    plt.show(), создаётся заново. Возвращает (fig, axes).
+    """
+    fig = _figures.get(key)
+    if fig is not None and plt.fignum_exists(fig.number):
+        fig.clear()
+        if figsize is not None:
+            fig.set_size_inches(figsize)
+        axes = fig.subplots(nrows, ncols, **subplot_kw)
+    else:
+        fig, axes = plt.subplots(nrows, ncols, figsize=figsize, **subplot_kw)
+        _figures[key] = fig
+    plt.figure(fig.number)
+    return fig, axes
+
+
+def finish_figure(fig, name):
+    """Показать фигуру или, в пакетном режиме, сохранить её в файлы name.<формат>"""
+    if _output['directory'] is None:
+        plt.show()
+        return []
+    os.makedirs(_output['directory'], exist_ok=True)
+    paths = []
+    for fmt in _output['formats']:
+        path = os.path.join(_output['directory'], f"{name}.{fmt}")
+        fig.savefig(path, bbox_inches='tight')
+        paths.append(path)
+    return paths
+
+
+def decimate(x, y, max_points=MAX_POINTS):
+    """
+    Прореживание ряда для отрисовки: в каждой корзине остаются точки
+    минимума и максимума, поэтому пики и провалы сохраняются.
+    """
+    y = np.asarray(y)
+    x = np.arange(1, len(y) + 1) if x is None else np.asarray(x)
+    if len(y) <= max_points:
+        return x, y
+    n_buckets = max_points // 2
+    edges = np.linspace(0, len(y), n_buckets + 1).astype(np.int64)
+    starts = edges[:-1]
+    # Индексы минимума и максимума внутри каждой корзины
+    lo = np.minimum.reduceat(y, starts)
+    hi = np.maximum.reduceat(y, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_lo = y == lo[bucket]
+    is_hi = y == hi[bucket]
+    first_lo = np.full(n_buckets, len(y))
+    first_hi = np.full(n_buckets, len(y))
+    positions = np.arange(len(y))
+    np.minimum.at(first_lo, bucket[is_lo], positions[is_lo])
+    np.minimum.at(first_hi, bucket[is_hi], positions[is_hi])
+    keep = np.unique(np.concatenate([first_lo, first_hi]))
+    return x[keep], y[keep]